@@ -0,0 +1,94 @@
+"""
+========
+NEATCODE
+========
+
+A small pure python library containing implementations of common python patterns.
+
+The public names of the submodules are accessible from the package. Submodules are imported
+lazily (PEP 562), on the first access to one of their names, so importing the package is cheap.
+
+    base                    Base classes for consistent representation and documentation
+    context_management      Context Manager pattern implementations
+    decoration              Decorator pattern implementations
+    object_manipulation     Callables for extracting from and calling objects
+    policy                  Interchangeable policies used by the other submodules
+"""
+
+_SUBMODULES = ("base",
+                "context_management",
+                "decoration",
+                "object_manipulation",
+                "policy")
+
+_LAZY_NAMES = {
+    # base
+    "ConsistentObjectRepresentingBase" : "base",
+    "AutoDocumentingBase" : "base",
+
+    # context_management
+    "DictOverlapCM" : "context_management",
+    "NameOverlapCM" : "context_management",
+    "BuiltinOverlapCM" : "context_management",
+    "MemoScopeCM" : "context_management",
+    "ObjectLifecycleCM" : "context_management",
+    "SelfConstructingOLCM" : "context_management",
+    "SharedArgumentsCM" : "context_management",
+    "GarbageCollectorCM" : "context_management",
+    "TimingCM" : "context_management",
+    "MemoryCM" : "context_management",
+    "ConcurrencyLimitCM" : "context_management",
+    "ConcurrencyLimitExceeded" : "context_management",
+    "MultiCMWrapper" : "context_management",
+    "CombinedCM" : "context_management",
+    "CMIterator" : "context_management",
+
+    # decoration
+    "DecoratorBase" : "decoration",
+    "Decorator" : "decoration",
+    "PreargumentDecorator" : "decoration",
+    "ArgPackDecorator" : "decoration",
+    "ArgUnpackDecorator" : "decoration",
+    "PosargsUnpackDecorator" : "decoration",
+    "KwargsUnpackDecorator" : "decoration",
+    "ReturnValueSelectorDecorator" : "decoration",
+    "RateLimitDecorator" : "decoration",
+    "RateLimitExceeded" : "decoration",
+    "BatchingDecorator" : "decoration",
+    "RetryDecorator" : "decoration",
+    "TimeoutDecorator" : "decoration",
+    "HedgingDecorator" : "decoration",
+    "CircuitBreakerDecorator" : "decoration",
+    "CircuitOpenError" : "decoration",
+    "MultiCallableDecorator" : "decoration",
+    "CompositionDecorator" : "decoration",
+    "CombinationDecorator" : "decoration",
+    "DispatchDecorator" : "decoration",
+    "CompiledStack" : "decoration",
+    "compile_stack" : "decoration",
+
+    # object_manipulation
+    "AttributeExtractor" : "object_manipulation",
+    "KeyExtractor" : "object_manipulation",
+    "ObjectCaller" : "object_manipulation",
+    "MethodCaller" : "object_manipulation",
+    "SharedBuffer" : "object_manipulation",
+    "SharedMemoryObjectCaller" : "object_manipulation",
+}
+
+__all__ = (*_SUBMODULES, *_LAZY_NAMES)
+
+def __getattr__(name):
+    if name in _SUBMODULES: module_name = name
+    elif name in _LAZY_NAMES: module_name = _LAZY_NAMES[name]
+    else: raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    import importlib as _importlib
+    module = _importlib.import_module("." + module_name, __name__)
+
+    value = module if name == module_name else getattr(module, name)
+    globals()[name] = value # Later accesses do not go through __getattr__
+    return value
+
+def __dir__():
+    return sorted(set((*globals(), *__all__)))
@@ -4,25 +4,117 @@ import itertools as _itertools
 
 class ConsistentObjectRepresentingBase(object):
     _REPR_STR="{className}({args})"
+    _REPR_MAX_LENGTH=None # Abbreviate longer reprs (None to never abbreviate)
+    _REPR_ABBREVIATION="..."
+
     def __init__(self, 
                     args=tuple(), 
                     kwargs=dict()):
         self._repr_args = args
         self._repr_kwargs = kwargs
 
+        # The reprs are cached. The repr of an argument of this class (or held in a tuple, list or
+        # dict argument) is reused while its version is unchanged, other arguments are repr'd again
+        # on every validation of the cache
+        self._repr_cache = None
+        self._repr_version = 0
+
     def __repr__(self):
-        return self._get_repr()
+        self._validate_repr_cache()
+        return self._get_cached_repr()
+
+    # Cache management
+    def _invalidate_repr(self):
+        """Drop the cached reprs (needed if the repr depends on more than the repr arguments)."""
+        self._repr_cache = None
+
+    def _validate_repr_cache(self):
+        # Arguments of this class are validated before the objects containing them, iteratively so
+        # that deep stacks do not recurse
+        stack = [(self,False)]
+        seen = set()
+        while len(stack) > 0:
+            obj, children_validated = stack.pop()
+            if children_validated:
+                obj._update_repr_cache()
+            elif id(obj) not in seen:
+                seen.add(id(obj))
+                stack.append((obj,True))
+                stack.extend([(child,False) for child in obj._get_repr_children()])
+
+        return self._repr_cache
+
+    def _get_repr_children(self):
+        children = []
+        for value in (*self._repr_args,*self._repr_kwargs.values()):
+            if type(value) in (tuple,list,dict): # Containers are looked into one level deep
+                values = value.values() if type(value) is dict else value
+                children.extend([v for v in values if isinstance(v,ConsistentObjectRepresentingBase)])
+            elif isinstance(value,ConsistentObjectRepresentingBase):
+                children.append(value)
+        return children
+
+    def _update_repr_cache(self):
+        args_keys = tuple(map(self._get_repr_key,self._repr_args))
+        kwargs_keys = tuple(map(self._get_repr_key,self._repr_kwargs.values()))
+        key = (args_keys, tuple(self._repr_kwargs), kwargs_keys)
+        if self._repr_cache is not None and self._repr_cache[0] == key: return
+
+        args = tuple(map(self._get_key_repr,args_keys))
+        kwargs = dict(zip(self._repr_kwargs.keys(),map(self._get_key_repr,kwargs_keys)))
+        args_str = self._combine_argsrepr(args,kwargs)
+
+        self._repr_cache = (key, args, kwargs, args_str, self._get_formated_repr(args_str))
+        self._repr_version += 1
+
+    @classmethod
+    def _get_repr_key(cls,obj):
+        if type(obj) in (tuple,list):
+            return (type(obj), tuple(map(cls._get_item_key,obj)))
+        if type(obj) is dict:
+            return (dict, tuple(((repr(k), cls._get_item_key(v)) for k, v in obj.items())))
+        return cls._get_item_key(obj)
+
+    @staticmethod
+    def _get_item_key(obj):
+        if isinstance(obj,ConsistentObjectRepresentingBase):
+            return (obj, obj._repr_version, obj._REPR_MAX_LENGTH)
+        return repr(obj)
+
+    @classmethod
+    def _get_key_repr(cls,key): # Containers are formatted as their builtin repr
+        kind = key[0] if type(key) is tuple else None
+        if kind is tuple:
+            items = tuple(map(cls._get_item_repr,key[1]))
+            return "({}{})".format(", ".join(items),"," if len(items) == 1 else "")
+        if kind is list:
+            return "[{}]".format(", ".join(map(cls._get_item_repr,key[1])))
+        if kind is dict:
+            items = ("{}: {}".format(k,cls._get_item_repr(v)) for k, v in key[1])
+            return "{{{}}}".format(", ".join(items))
+        return cls._get_item_repr(key)
+
+    @staticmethod
+    def _get_item_repr(key):
+        if isinstance(key,str): return key
+        return key[0]._get_cached_repr()
 
     # Get methods
     def _get_repr(self):
-        args, kwargs = self._get_argsrepr()
-        args_str = self._combine_argsrepr(args,kwargs)
+        return self._validate_repr_cache()[4]
 
-        return self._get_formated_repr(args_str)
+    def _get_cached_repr(self): # Abbreviated if longer than _REPR_MAX_LENGTH
+        _, _, _, args_str, repr_str = self._repr_cache
+        max_length = self._REPR_MAX_LENGTH
+        if max_length is None or len(repr_str) <= max_length: return repr_str
 
+        overhead = len(repr_str) - len(args_str) + len(self._REPR_ABBREVIATION)
+        args_str = args_str[:max(0,max_length - overhead)] + self._REPR_ABBREVIATION
+        return self._get_formated_repr(args_str)
 
     def _get_argsrepr(self):
-        return self._compute_argsrepr(self._repr_args,self._repr_kwargs)
+        _, args, kwargs, _, _ = self._validate_repr_cache()
+        return args, dict(kwargs)
 
 
     def _get_formated_repr(self,args_str):
@@ -13,6 +13,7 @@ CMs for temporarily overlapping (substituting and adding) "names" to different n
     DictOverlapCM           Overlap the values of names (keys) in a dictionary
     NameOverlapCM           Overlap the values of names in a namespace (global namespace by default)
     BuiltinOverlapCM        Overlap builtin values (use with caution)
+    MemoScopeCM             Memoize global functions for the duration of the context
 
 
 Object Lifecycle CMs
@@ -22,6 +23,7 @@ CMs for managing the *lifecycle* (creation and destruction) of objects.
 
     ObjectLifecycleCM       Basic implementation of object lifecycle management
     SelfConstructingOLCM    User-extensible base class for lifecycle management
+    SharedArgumentsCM       Lifecycle of call arguments placed in shared memory
 
 
 Garbage Collection CMs
@@ -38,6 +40,20 @@ CMs for measuring the execution time of code blocks
 
     TimingCM                Record the timestamp at the beginning and the end of the context
 
+Memory CMs
+----------
+
+CMs for measuring the memory allocated by code blocks
+
+    MemoryCM                Record the peak and net allocated memory of the context
+
+Concurrency CMs
+---------------
+
+CMs for limiting the concurrent execution of code blocks
+
+    ConcurrencyLimitCM      Limit the number of threads or tasks inside the context
+
 Meta
 ----
 
@@ -72,15 +88,19 @@ class DictOverlapCM(object):
         self.dictionary.update(self.overwritten_dict)
         for k in self.added_keys: del self.dictionary[k] # TODO add exception handling
 
-import inspect as _inspect
+import sys as _sys
 class NameOverlapCM(DictOverlapCM):
     def __init__(self, overwrite_dict:dict, namespace=None):
         self.namespace = namespace
         if self.namespace is None:
-            cf = _inspect.currentframe()
+            cf = _sys._getframe()
             if cf is None:
                 pass # TODO add error for unexpected behaviour
-            globals_ = cf.f_back.f_globals
+            # Skip the __init__ frames of this object (subclasses calling super().__init__)
+            while (cf.f_code.co_name == "__init__"
+                    and cf.f_locals.get("self") is self):
+                cf = cf.f_back
+            globals_ = cf.f_globals
             super().__init__(globals_,overwrite_dict)
         else:
             super().__init__(self.namespace.__dict__,overwrite_dict)
@@ -90,6 +110,60 @@ class BuiltinOverlapCM(NameOverlapCM):
     def __init__(self, overwrite_dict:dict):
         super().__init__(overwrite_dict,_builtins)
 
+class MemoScopeCM(NameOverlapCM):
+    """
+        Memoize global functions for the duration of the context.
+
+        On context entry the functions named in `names` are overlapped (see `NameOverlapCM`) with
+        memoized versions of themselves. On exit the original functions are restored and the caches
+        are dropped. Contexts may be nested; the inner context memoizes the functions as they
+        are at its entry.
+
+        Arguments of memoized calls must be hashable. `maxsize` bounds each cache (unbounded by
+        default). The cache statistics of the last context are accessible as the attribute
+        `cache_info` (a dictionary from names to `functools` cache infos), and are passed to the
+        optional callback `report` on exit.
+    """
+    def __init__(self,
+                    names : tuple,
+                    namespace = None,
+                    maxsize : int = None,
+                    report : "callable" = None):
+        super().__init__(dict(),namespace)
+
+        self.names = tuple(names)
+        self.maxsize = maxsize
+        self.report = report
+
+        self.cache_info = dict()
+
+    def __enter__(self):
+        import functools as _functools
+
+        memoize = _functools.lru_cache(maxsize=self.maxsize)
+        functions = map(self.dictionary.__getitem__,self.names)
+        self.overwrite_dict = dict(zip(self.names,map(memoize,functions)))
+
+        super().__enter__()
+        return self
+
+    def __exit__(self,*args,**kwargs):
+        memoized = self.overwrite_dict
+        super().__exit__(*args,**kwargs)
+
+        self.cache_info = {name : f.cache_info() for name, f in memoized.items()}
+        for f in memoized.values(): f.cache_clear()
+        self.overwrite_dict = dict()
+
+        if self.report is not None: self.report(self.cache_info)
+
+    def hit_rate(self, name=None):
+        """Hit rate of the cache of the function `name` (of all the caches if None) in the last context."""
+        infos = self.cache_info.values() if name is None else (self.cache_info[name],)
+        hits = sum((info.hits for info in infos))
+        total = hits + sum((info.misses for info in infos))
+        return hits / total if total > 0 else 0.0
+
 ## Object lifecycle
 class ObjectLifecycleCM(object):
     """
@@ -134,6 +208,31 @@ class SelfConstructingOLCM(ObjectLifecycleCM):
     def _construct(self, *args, **kwargs):
         return None
 
+class SharedArgumentsCM(ObjectLifecycleCM):
+    """
+        Lifecycle of call arguments placed in shared memory.
+
+        Creates a `SharedMemoryObjectCaller` (see `neatcode.object_manipulation`) with the given
+        arguments on entering the context, and releases and destroys its shared memory segments on
+        exit.
+    """
+    def __init__(self,
+                    args : tuple = tuple(),
+                    kwargs : dict = dict(),
+                    min_nbytes : int = 0):
+        import neatcode.object_manipulation as _object_manipulation
+
+        super().__init__(_object_manipulation.SharedMemoryObjectCaller,
+                            args=(args,kwargs,min_nbytes))
+
+    def __exit__(self,*args,**kwargs):
+        if self.o is not None:
+            try:
+                self.o.close()
+            finally:
+                self.o.unlink()
+        super().__exit__(*args,**kwargs)
+
 ## Garbage Collection
 import gc as _gc
 
@@ -180,6 +279,204 @@ class TimingCM(object):
     def t_delta(self):
         return self.t_end - self.t_start
 
+## Memory
+import os as _os
+
+try:
+    _PAGE_SIZE = _os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+class MemoryCM(object):
+    """
+        Record the peak and net allocated memory of the context.
+
+        Allocations are traced with `tracemalloc` (tracing is started on entry if it is not active
+        and stopped on exit). The bytes allocated by the last context (`net_bytes`) and its peak
+        allocation over the memory at entry (`peak_bytes`) are accessible as attributes, together
+        with the change of the resident set size (`rss_delta`, only available on Linux, None
+        otherwise). With `top_n` > 0, the `top_n` allocation sites with the largest size change are
+        stored in `top_stats` as `tracemalloc.StatisticDiff` objects.
+
+        The measurements are accumulated across entries: `n_entries`, `total_net_bytes`,
+        `max_peak_bytes` and `total_rss_delta`. The mean net allocation per entry is accessible as a
+        method `mean_net_bytes`.
+
+        Nested MemoryCMs reset the peak of the enclosing ones. The peak of a context can only be
+        measured on Python >= 3.9 (`tracemalloc.reset_peak`): on earlier versions `peak_bytes` and
+        `max_peak_bytes` are None.
+    """
+    _STATM_PATH = "/proc/self/statm"
+
+    def __init__(self, 
+                    top_n : int = 0,
+                    key_type : str = "lineno"):
+        self.top_n = top_n
+        self.key_type = key_type
+
+        self.net_bytes = 0
+        self.peak_bytes = 0 if self._can_reset_peak() else None
+        self.rss_delta = None
+        self.top_stats = []
+
+        self.n_entries = 0
+        self.total_net_bytes = 0
+        self.max_peak_bytes = 0 if self._can_reset_peak() else None
+        self.total_rss_delta = None
+
+        self._started_tracing = False
+        self._start_bytes = 0
+        self._start_rss = None
+        self._start_snapshot = None
+
+    @staticmethod
+    def _can_reset_peak():
+        return _sys.version_info >= (3,9) # tracemalloc.reset_peak
+
+    def __enter__(self):
+        import tracemalloc as _tracemalloc
+
+        self._started_tracing = not _tracemalloc.is_tracing()
+        if self._started_tracing: _tracemalloc.start()
+
+        if self.top_n > 0: self._start_snapshot = _tracemalloc.take_snapshot()
+        self._start_rss = self._get_rss()
+
+        if self._can_reset_peak(): _tracemalloc.reset_peak()
+        self._start_bytes, _ = _tracemalloc.get_traced_memory()
+        return self
+
+    def __exit__(self,*args,**kwargs):
+        import tracemalloc as _tracemalloc
+
+        end_bytes, peak = _tracemalloc.get_traced_memory()
+        end_rss = self._get_rss()
+
+        if self.top_n > 0:
+            snapshot = _tracemalloc.take_snapshot()
+            self.top_stats = snapshot.compare_to(self._start_snapshot,self.key_type)[:self.top_n]
+            self._start_snapshot = None
+
+        if self._started_tracing: _tracemalloc.stop()
+
+        self.net_bytes = end_bytes - self._start_bytes
+        self.peak_bytes = peak - self._start_bytes if self._can_reset_peak() else None
+        self.rss_delta = None
+        if self._start_rss is not None and end_rss is not None:
+            self.rss_delta = end_rss - self._start_rss
+
+        self.n_entries += 1
+        self.total_net_bytes += self.net_bytes
+        if self.peak_bytes is not None:
+            self.max_peak_bytes = max(self.max_peak_bytes,self.peak_bytes)
+        if self.rss_delta is not None:
+            self.total_rss_delta = (self.total_rss_delta or 0) + self.rss_delta
+
+    def mean_net_bytes(self):
+        return self.total_net_bytes / self.n_entries if self.n_entries > 0 else 0.0
+
+    def _get_rss(self):
+        try:
+            with open(self._STATM_PATH) as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        return rss_pages * _PAGE_SIZE
+
+## Concurrency
+class ConcurrencyLimitExceeded(RuntimeError):
+    pass
+
+class ConcurrencyLimitCM(object):
+    """
+        Limit the number of threads or tasks inside the context.
+
+        Semaphore with `limit` slots, entered with `with` by threads or with `async with` by
+        asyncio tasks (an instance should be used in only one of the two modes). When no slot is
+        free, entries wait (`blocking`) up to `timeout` seconds, or raise `ConcurrencyLimitExceeded`.
+
+        Metrics are accessible as attributes: `entries`, `waits`, `wait_time` (total seconds
+        waited), `rejections`, `active` and `max_active`.
+    """
+    def __init__(self,
+                    limit : int,
+                    blocking : bool = True,
+                    timeout : float = None,
+                    clock : "callable" = _time.monotonic):
+        import threading as _threading
+
+        self.limit = limit
+        self.blocking = blocking
+        self.timeout = timeout
+        self.clock = clock
+
+        self.entries = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.rejections = 0
+        self.active = 0
+        self.max_active = 0
+
+        self._semaphore = _threading.BoundedSemaphore(limit)
+        self._async_semaphore = None # Created on first use, in the running event loop
+        self._lock = _threading.Lock()
+
+    def __enter__(self):
+        if not self._semaphore.acquire(False):
+            t_start = self.clock()
+            acquired = self.blocking and self._semaphore.acquire(True,self.timeout)
+            self._record_wait(acquired,self.clock() - t_start)
+        self._record_entry()
+        return self
+
+    def __exit__(self,*args,**kwargs):
+        self._record_exit()
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        import asyncio as _asyncio
+
+        if self._async_semaphore is None: self._async_semaphore = _asyncio.Semaphore(self.limit)
+
+        if self._async_semaphore.locked():
+            t_start = self.clock()
+            acquired = False
+            if self.blocking:
+                try:
+                    await _asyncio.wait_for(self._async_semaphore.acquire(),self.timeout)
+                    acquired = True
+                except _asyncio.TimeoutError:
+                    pass
+            self._record_wait(acquired,self.clock() - t_start)
+        else:
+            await self._async_semaphore.acquire()
+
+        self._record_entry()
+        return self
+
+    async def __aexit__(self,*args,**kwargs):
+        self._record_exit()
+        self._async_semaphore.release()
+
+    # Metrics
+    def _record_wait(self,acquired,wait_time):
+        with self._lock:
+            if not acquired:
+                self.rejections += 1
+                raise ConcurrencyLimitExceeded("Concurrency limit of {} exceeded".format(self.limit))
+            self.waits += 1
+            self.wait_time += wait_time
+
+    def _record_entry(self):
+        with self._lock:
+            self.entries += 1
+            self.active += 1
+            self.max_active = max(self.max_active,self.active)
+
+    def _record_exit(self):
+        with self._lock:
+            self.active -= 1
+
 ## META
 class MultiCMWrapper(object): # TODO 
     """
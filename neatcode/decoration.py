@@ -1,15 +1,58 @@
 # TODO document code
 
-import neatcode.policy as _policy
+# Imports of `neatcode.policy`, `re` and `asyncio` are deferred to their first use, to keep the
+# import of this module cheap.
 import neatcode.object_manipulation as _object_manipulation
 import neatcode.base as _base
 
-import re as _re
 import itertools as _itertools
 
+def _is_async_callable(obj):
+    """True if calling `obj` returns an awaitable: coroutine functions (including those marked with
+    `inspect.markcoroutinefunction`), callables with a coroutine `__call__`, partials of those and
+    async neatcode decorators."""
+    if getattr(obj,"is_async",False) is True: return True
+    if isinstance(obj,type): return False
+
+    import functools as _functools
+    import inspect as _inspect
+
+    while isinstance(obj,_functools.partial):
+        obj = obj.func
+
+    if _inspect.iscoroutinefunction(obj): return True
+    return _inspect.iscoroutinefunction(getattr(obj,"__call__",None))
+
+def _sleep(sleep,delay):
+    """Sleep with `sleep` (`time.sleep` if None)."""
+    if sleep is None:
+        import time as _time
+        sleep = _time.sleep
+    sleep(delay)
+
+async def _async_sleep(sleep,delay):
+    """Sleep with `sleep` (`asyncio.sleep` if None), awaiting it if it is a coroutine function."""
+    if sleep is None:
+        import asyncio as _asyncio
+        sleep = _asyncio.sleep
+    r = sleep(delay)
+    if _is_async_callable(sleep): await r
+
+def _get_clock(clock):
+    if clock is None:
+        import time as _time
+        clock = _time.monotonic
+    return clock
+
+def _default_preargs():
+    import neatcode.policy.argument_substitution as argument_substitution
+    return argument_substitution.default_preargs
+
 class DecoratorBase(_base.ConsistentObjectRepresentingBase,
                     _base.AutoDocumentingBase): # base
-    _SHALLOW_REGEX=_re.compile(r"^([^()]*)(\(.*\))?$")
+    _SHALLOW_PATTERN=r"^([^()]*)(\(.*\))?$"
+    _SHALLOW_REGEX=None # Compiled on first use
+    is_async = False
 
     def __init__(self,
                     args=tuple(),
@@ -18,9 +61,36 @@ class DecoratorBase(_base.ConsistentObjectRepresentingBase,
         _base.ConsistentObjectRepresentingBase.__init__(self,args=args,kwargs=kwargs)
         _base.AutoDocumentingBase.__init__(self)
 
+    # Pickling: the classes of this module reduce to their construction arguments (see their
+    # `__reduce__`). Subclasses with a constructor of their own are pickled by state instead.
+    def __reduce_ex__(self,protocol):
+        init_owner = next(c for c in type(self).__mro__ if "__init__" in vars(c))
+        if init_owner.__module__ == __name__: return self.__reduce__()
+
+        import copyreg as _copyreg
+        state = dict(self.__dict__)
+        del state["__doc__"] # Rebuilt on unpickling
+        if "_lock" in state: state["_lock"] = None # Locks cannot be pickled
+        return (_copyreg.__newobj__, (type(self),), state)
+
+    def __setstate__(self,state):
+        import threading as _threading
+
+        self.__dict__.update(state)
+        if "_lock" in state: self._lock = _threading.Lock()
+        self._generate_doc()
+
+    @classmethod
+    def _get_shallow_regex(cls):
+        if cls._SHALLOW_REGEX is None:
+            import re as _re
+            cls._SHALLOW_REGEX = _re.compile(cls._SHALLOW_PATTERN)
+        return cls._SHALLOW_REGEX
+
     def _get_shallow_args(self,args,kwargs):
-        args_match = map(self._SHALLOW_REGEX.match,args)
-        kwargs_match = map(self._SHALLOW_REGEX.match,kwargs.values())
+        regex = self._get_shallow_regex()
+        args_match = map(regex.match,args)
+        kwargs_match = map(regex.match,kwargs.values())
 
         args_values = tuple((m.group(1) for m in args_match))
         kwargs_values = tuple((m.group(1) for m in kwargs_match))
@@ -34,12 +104,17 @@ class Decorator(DecoratorBase): # Base class for single callable decorators
     _DOC_FORMAT = "\n@ Decorated by:\t{decoratorRepr}\n{callableDoc}"
     def __init__(self, callable_, args=tuple(),kwargs=dict()):
         self.callable = callable_
+        self.is_async = _is_async_callable(callable_)
     
         super().__init__(args=(self.callable,*args),kwargs=kwargs)
 
     def __call__(self,*args,**kwargs):
         return self.callable(*args,**kwargs)
 
+    # Pickling (classes of this module with more construction parameters override this)
+    def __reduce__(self):
+        return (type(self), (self.callable,))
+
     # Doc generation
     def _get_doc(self): 
         c_doc = self.callable.__doc__ or ""
@@ -67,14 +142,21 @@ class PreargumentDecorator(Decorator):
                     callable_, 
                     preargs=tuple(), 
                     prekwargs=dict(),
-                    substitution_policy=_policy.argument_substitution.default_preargs):
+                    substitution_policy=None): # argument_substitution.default_preargs if None
         super().__init__(callable_)
 
         self.preargs = preargs
         self.prekwargs = prekwargs
 
+        if substitution_policy is None: substitution_policy = _default_preargs()
         self.substitution_policy = substitution_policy
 
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.preargs,
+                                self.prekwargs,
+                                self.substitution_policy))
+
     def __call__(self,*postargs,**postkwargs):
         args, kwargs = self.substitution_policy(self.preargs,
                                                 postargs,
@@ -98,6 +180,13 @@ class ArgPackDecorator(Decorator):
         self.invert_positions = invert_positions
         self.discard_empty = discard_empty
 
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.args_kw,
+                                self.kwarg_kw,
+                                self.invert_positions,
+                                self.discard_empty))
+
     def __call__(self,*args,**kwargs):
         f_args = []
         f_kwargs = {}
@@ -151,16 +240,28 @@ class ReturnValueSelectorDecorator(Decorator):
     def __init__(self, 
                     callable_, 
                     rvalue_keys,
-                    subscription_error_handler=_default_error_handler):
+                    subscription_error_handler=None):
         super().__init__(callable_)
 
         self.rvalue_keys = rvalue_keys
 
+        if subscription_error_handler is None: 
+            subscription_error_handler = self._default_error_handler
         self.subscription_error_handler = subscription_error_handler
 
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.rvalue_keys,
+                                self.subscription_error_handler))
+
     def __call__(self,*args,**kwargs):
-        r_value = super().__call__(*args,**kwargs)
+        if self.is_async: return self._async_call(*args,**kwargs)
+        return self._select(super().__call__(*args,**kwargs))
 
+    async def _async_call(self,*args,**kwargs):
+        return self._select(await super().__call__(*args,**kwargs))
+
+    def _select(self,r_value):
         vals = []
         for r_val_idx in self.rvalue_keys:
             try:
@@ -173,12 +274,702 @@ class ReturnValueSelectorDecorator(Decorator):
 
 
 
+## Rate limiting
+class RateLimitExceeded(RuntimeError):
+    pass
+
+class RateLimitDecorator(Decorator):
+    """
+        Limit the rate at which the decorated callable is called.
+
+        Admissions are controlled by a bucket from `neatcode.policy.rate_limiting` (`TokenBucket`
+        by default), constructed as `bucket(rate, capacity)`. With a `key_extractor` (called with
+        the arguments of each call, e.g. a `KeyExtractor`), a separate bucket is kept for each key.
+        Idle buckets are discarded whenever the number of buckets doubles, so the table stays
+        proportional to the number of recently active keys.
+
+        Calls that are not admitted immediately wait (`blocking`) up to `max_wait` seconds, or
+        raise `RateLimitExceeded`. Coroutine callables wait with `asyncio.sleep`.
+
+        Metrics are accessible as attributes: `calls`, `waits`, `wait_time` (total seconds
+        waited) and `rejections`. The clock (`time.monotonic`) and sleep function are configurable.
+    """
+    _MIN_MAX_BUCKETS = 64 # Idle buckets are never discarded below this number of buckets
+
+    def __init__(self,
+                    callable_,
+                    rate,
+                    capacity=1,
+                    bucket=None, # rate_limiting.TokenBucket if None
+                    key_extractor=None,
+                    blocking=True,
+                    max_wait=None,
+                    clock=None,
+                    sleep=None):
+        import threading as _threading
+        import neatcode.policy.rate_limiting as rate_limiting
+
+        super().__init__(callable_)
+
+        self.rate = rate
+        self.capacity = capacity
+        self.bucket = bucket if bucket is not None else rate_limiting.TokenBucket
+        self.key_extractor = key_extractor
+        self.blocking = blocking
+        self.max_wait = max_wait
+        self.clock = _get_clock(clock)
+        self.sleep = sleep
+
+        self.calls = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.rejections = 0
+
+        self._buckets = dict()
+        self._max_buckets = self._MIN_MAX_BUCKETS
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.rate,
+                                self.capacity,
+                                self.bucket,
+                                self.key_extractor,
+                                self.blocking,
+                                self.max_wait,
+                                self.clock,
+                                self.sleep))
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        delay = self._acquire(args,kwargs)
+        if delay > 0: _sleep(self.sleep,delay)
+
+        return super().__call__(*args,**kwargs)
+
+    async def _async_call(self,*args,**kwargs):
+        delay = self._acquire(args,kwargs)
+        if delay > 0: await _async_sleep(self.sleep,delay)
+
+        return await super().__call__(*args,**kwargs)
+
+    def _acquire(self,args,kwargs):
+        """Admit a call, returning the time to wait before it."""
+        key = None
+        if self.key_extractor is not None: key = self.key_extractor(*args,**kwargs)
+
+        with self._lock:
+            self.calls += 1
+            now = self.clock()
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self._max_buckets: self._discard_idle_buckets(now)
+                bucket = self._buckets[key] = self.bucket(self.rate,self.capacity)
+            delay = bucket.delay(now)
+            if delay > 0 and (not self.blocking
+                                or delay == float("inf")
+                                or (self.max_wait is not None and delay > self.max_wait)):
+                self.rejections += 1
+                raise RateLimitExceeded("Rate limit exceeded for key {!r} (wait {:.3f}s)".format(key,delay))
+
+            bucket.consume(now)
+            if delay > 0:
+                self.waits += 1
+                self.wait_time += delay
+
+        return delay
+
+    def _discard_idle_buckets(self,now):
+        """Drop the buckets in their initial state (called with the lock held)."""
+        idle_keys = [key for key, bucket in self._buckets.items() if bucket.idle(now)]
+        for key in idle_keys: del self._buckets[key]
+
+        self._max_buckets = max(self._MIN_MAX_BUCKETS,2*len(self._buckets))
+
+
+## Batching
+def _pack_pair(args,kwargs):
+    return args, kwargs
+
+class BatchingDecorator(Decorator):
+    """
+        Group individual calls into calls to a bulk callable.
+
+        The decorated callable is the bulk callable: it is called with a list of items, one per
+        individual call, and returns a sequence with the result of each item. Items are built by
+        `packer`, called with the arguments of each individual call (by default an
+        `ArgPackDecorator` that packs them as a pair `(args, kwargs)`).
+
+        A batch is flushed when it reaches `max_batch_size` calls, `max_wait` seconds after its
+        first call (never if None) or when `flush` is called. Used as a CM (e.g. in a `CombinedCM`),
+        the pending calls are flushed on context exit.
+
+        With a coroutine bulk callable, calls return awaitables and are batched among the tasks of
+        the running event loop. Otherwise calls are batched among threads, which block until their
+        result is ready. Metrics are accessible as attributes: `calls` and `batches`.
+
+        Note that with a synchronous bulk callable and `max_wait` None, a call that does not fill
+        the batch blocks until another thread fills it or calls `flush` (or exits the context): a
+        single-threaded caller deadlocks, since it cannot reach the flush.
+    """
+    def __init__(self,
+                    callable_,
+                    max_batch_size=64,
+                    max_wait=0.01,
+                    packer=None): # ArgPackDecorator(_pack_pair) if None
+        import threading as _threading
+
+        super().__init__(callable_)
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        if packer is None: packer = ArgPackDecorator(_pack_pair,discard_empty=False)
+        self.packer = packer
+
+        self.calls = 0
+        self.batches = 0
+
+        self._pending = []
+        self._timer = None
+        self._loop = None
+        self._tasks = set()
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.max_batch_size,
+                                self.max_wait,
+                                self.packer))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args,**kwargs):
+        self.flush()
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        import concurrent.futures as _futures
+
+        future = _futures.Future()
+        batch = self._enqueue(self.packer(*args,**kwargs),future,self._start_thread_timer)
+        if batch is not None: self._run_batch(batch)
+
+        return future.result()
+
+    async def _async_call(self,*args,**kwargs):
+        import asyncio as _asyncio
+
+        self._loop = _asyncio.get_running_loop()
+        future = self._loop.create_future()
+        batch = self._enqueue(self.packer(*args,**kwargs),future,self._start_loop_timer)
+        # The bulk call runs in its own task, so that cancelling this caller does not leave the
+        # other calls of the batch unresolved
+        if batch is not None: self._schedule_async_batch(batch)
+
+        return await future
+
+    def flush(self):
+        """Call the bulk callable with the pending calls."""
+        with self._lock:
+            batch = self._take_batch()
+            loop = self._loop
+
+        if len(batch) == 0: return
+        if self.is_async: loop.call_soon_threadsafe(self._schedule_async_batch,batch)
+        else: self._run_batch(batch)
+
+    # Pending calls
+    def _enqueue(self,item,future,start_timer):
+        """Add a call, returning the batch to run if it is full."""
+        with self._lock:
+            self.calls += 1
+            self._pending.append((item,future))
+
+            if len(self._pending) >= self.max_batch_size: return self._take_batch()
+            if len(self._pending) == 1 and self.max_wait is not None: self._timer = start_timer()
+        return None
+
+    def _take_batch(self):
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if len(batch) > 0: self.batches += 1
+        return batch
+
+    def _start_thread_timer(self):
+        import threading as _threading
+
+        timer = _threading.Timer(self.max_wait,self.flush)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _start_loop_timer(self):
+        return self._loop.call_later(self.max_wait,self.flush)
+
+    # Bulk calls
+    def _run_batch(self,batch):
+        items, futures = zip(*batch)
+        try:
+            results = self.callable(list(items))
+        except Exception as e:
+            self._set_exception(futures,e)
+        else:
+            self._set_results(futures,results)
+
+    async def _run_async_batch(self,batch):
+        items, futures = zip(*batch)
+        try:
+            results = await self.callable(list(items))
+        except Exception as e:
+            self._set_exception(futures,e)
+        else:
+            self._set_results(futures,results)
+
+    def _schedule_async_batch(self,batch):
+        task = self._loop.create_task(self._run_async_batch(batch))
+        self._tasks.add(task) # Keep a reference until done
+        task.add_done_callback(self._tasks.discard)
+
+    def _set_results(self,futures,results):
+        results = list(results)
+        if len(results) != len(futures):
+            error = ValueError("Bulk callable returned {} results for {} calls".format(len(results),len(futures)))
+            return self._set_exception(futures,error)
+
+        for future, result in zip(futures,results):
+            if not future.done(): future.set_result(result)
+
+    def _set_exception(self,futures,error):
+        for future in futures:
+            if not future.done(): future.set_exception(error)
+
+
+## Resilience
+def _run_in_thread(callable_,args,kwargs):
+    """Call `callable_` in a new daemon thread, returning a `concurrent.futures.Future`."""
+    import concurrent.futures as _futures
+    import threading as _threading
+
+    future = _futures.Future()
+    def run():
+        if not future.set_running_or_notify_cancel(): return
+        try:
+            future.set_result(callable_(*args,**kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    _threading.Thread(target=run,daemon=True).start()
+    return future
+
+class RetryDecorator(Decorator):
+    """
+        Retry calls that raise one of `exceptions`.
+
+        A call is attempted up to `max_retries` + 1 times, waiting between attempts the delay given by
+        `backoff` (exponential backoff with jitter by default, see `neatcode.policy.backoff`). If
+        `budget` is given, no retry is attempted that would start later than `budget` seconds after
+        the call. When the call gives up, the last exception is raised.
+
+        Metrics are accessible as attributes: `calls`, `attempts`, `retries` and `failures` (calls
+        that gave up). The clock (`time.monotonic`) and sleep function are configurable.
+    """
+    def __init__(self,
+                    callable_,
+                    max_retries=3,
+                    exceptions=(Exception,),
+                    backoff=None, # backoff.ExponentialBackoff() if None
+                    budget=None,
+                    clock=None,
+                    sleep=None):
+        import threading as _threading
+        import neatcode.policy.backoff as backoff_
+
+        super().__init__(callable_)
+
+        self.max_retries = max_retries
+        self.exceptions = exceptions
+        self.backoff = backoff if backoff is not None else backoff_.ExponentialBackoff()
+        self.budget = budget
+        self.clock = _get_clock(clock)
+        self.sleep = sleep
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.max_retries,
+                                self.exceptions,
+                                self.backoff,
+                                self.budget,
+                                self.clock,
+                                self.sleep))
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        with self._lock: self.calls += 1
+        t_start = self.clock()
+        for retry in _itertools.count():
+            with self._lock: self.attempts += 1
+            try:
+                return super().__call__(*args,**kwargs)
+            except self.exceptions:
+                delay = self._get_delay(retry,t_start)
+                if delay is None: raise
+            _sleep(self.sleep,delay)
+
+    async def _async_call(self,*args,**kwargs):
+        with self._lock: self.calls += 1
+        t_start = self.clock()
+        for retry in _itertools.count():
+            with self._lock: self.attempts += 1
+            try:
+                return await super().__call__(*args,**kwargs)
+            except self.exceptions:
+                delay = self._get_delay(retry,t_start)
+                if delay is None: raise
+            await _async_sleep(self.sleep,delay)
+
+    def _get_delay(self,retry,t_start):
+        """Delay before the retry `retry`, None if the call gives up."""
+        delay = None
+        if retry < self.max_retries:
+            delay = self.backoff(retry)
+            if self.budget is not None and self.clock() - t_start + delay > self.budget:
+                delay = None
+
+        with self._lock:
+            if delay is None: self.failures += 1
+            else: self.retries += 1
+        return delay
+
+class TimeoutDecorator(Decorator):
+    """
+        Raise `TimeoutError` on calls that take longer than `timeout` seconds.
+
+        Coroutine callables are cancelled on timeout (`asyncio.wait_for`). Other callables are run
+        in a separate thread, which keeps running in the background after a timeout.
+
+        Metrics are accessible as attributes: `calls` and `timeouts`.
+    """
+    def __init__(self, callable_, timeout):
+        super().__init__(callable_)
+
+        import threading as _threading
+
+        self.timeout = timeout
+
+        self.calls = 0
+        self.timeouts = 0
+
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable, self.timeout))
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        import concurrent.futures as _futures
+
+        self._count("calls")
+        future = _run_in_thread(self.callable,args,kwargs)
+
+        # Deadline expiry is told apart from a TimeoutError raised by the callable itself
+        done, _ = _futures.wait((future,),self.timeout)
+        if future in done: return future.result()
+
+        self._count("timeouts")
+        raise TimeoutError("Call timed out after {}s".format(self.timeout))
+
+    async def _async_call(self,*args,**kwargs):
+        import asyncio as _asyncio
+
+        self._count("calls")
+        task = _asyncio.ensure_future(super().__call__(*args,**kwargs))
+        try:
+            done, _ = await _asyncio.wait((task,),timeout=self.timeout)
+        finally:
+            if not task.done(): task.cancel()
+        if task in done: return task.result()
+
+        await _asyncio.wait((task,)) # Let the cancellation complete
+        self._count("timeouts")
+        raise TimeoutError("Call timed out after {}s".format(self.timeout))
+
+    def _count(self,counter):
+        with self._lock:
+            setattr(self,counter,getattr(self,counter) + 1)
+
+class HedgingDecorator(Decorator):
+    """
+        Fire a duplicate (hedged) call when a call is slower than usual.
+
+        The latencies of the last `window` calls are recorded. Once there are `min_samples` of them,
+        a call still running after the `percentile` of those latencies fires a duplicate call
+        (up to `max_hedges`), and the result of the first call to succeed is returned.
+
+        Coroutine callables run as tasks, and the calls that lose are cancelled. Other callables run
+        in separate threads, and the calls that lose keep running in the background.
+
+        Only the latencies of successful calls are recorded, each from its own start: fast failures
+        (e.g. during an outage) and hedged calls do not lower the hedge delay.
+
+        Metrics are accessible as attributes: `calls`, `hedges` and `hedge_wins`.
+    """
+    def __init__(self,
+                    callable_,
+                    percentile=95,
+                    min_samples=20,
+                    window=100,
+                    max_hedges=1,
+                    clock=None):
+        import collections as _collections
+        import threading as _threading
+
+        super().__init__(callable_)
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hedges = max_hedges
+        self.clock = _get_clock(clock)
+
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._latencies = _collections.deque(maxlen=window)
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.percentile,
+                                self.min_samples,
+                                self.window,
+                                self.max_hedges,
+                                self.clock))
+
+    def hedge_delay(self):
+        """Latency after which a call is hedged (None while there are too few samples)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) == 0 or len(latencies) < self.min_samples: return None
+
+        index = min(len(latencies) - 1, int(len(latencies)*self.percentile/100))
+        return latencies[index]
+
+    def _count(self,counter):
+        with self._lock:
+            setattr(self,counter,getattr(self,counter) + 1)
+
+    def _record(self,t_start,hedge):
+        with self._lock:
+            self._latencies.append(self.clock() - t_start)
+            if hedge > 0: self.hedge_wins += 1
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        import concurrent.futures as _futures
+
+        self._count("calls")
+        delay = self.hedge_delay()
+
+        pending = {_run_in_thread(self.callable,args,kwargs) : (0,self.clock())}
+        launched = 1
+        error = None
+        while len(pending) > 0:
+            hedging = delay is not None and launched <= self.max_hedges
+            done, _ = _futures.wait(pending,
+                                    delay if hedging else None,
+                                    _futures.FIRST_COMPLETED)
+            if len(done) == 0: # Slower than the hedge delay
+                self._count("hedges")
+                pending[_run_in_thread(self.callable,args,kwargs)] = (launched,self.clock())
+                launched += 1
+                continue
+
+            for future in done:
+                hedge, t_start = pending.pop(future)
+                if future.exception() is None:
+                    self._record(t_start,hedge)
+                    return future.result()
+                error = future.exception() if error is None else error
+
+        raise error
+
+    async def _async_call(self,*args,**kwargs):
+        import asyncio as _asyncio
+
+        self._count("calls")
+        delay = self.hedge_delay()
+
+        pending = {_asyncio.ensure_future(self.callable(*args,**kwargs)) : (0,self.clock())}
+        launched = 1
+        error = None
+        try:
+            while len(pending) > 0:
+                hedging = delay is not None and launched <= self.max_hedges
+                done, _ = await _asyncio.wait(pending,
+                                                timeout=delay if hedging else None,
+                                                return_when=_asyncio.FIRST_COMPLETED)
+                if len(done) == 0: # Slower than the hedge delay
+                    self._count("hedges")
+                    task = _asyncio.ensure_future(self.callable(*args,**kwargs))
+                    pending[task] = (launched,self.clock())
+                    launched += 1
+                    continue
+
+                for task in done:
+                    hedge, t_start = pending.pop(task)
+                    if task.exception() is None:
+                        self._record(t_start,hedge)
+                        return task.result()
+                    error = task.exception() if error is None else error
+        finally:
+            for task in pending: task.cancel()
+
+        raise error
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreakerDecorator(Decorator):
+    """
+        Stop calling a failing callable for a while.
+
+        The circuit opens after `failure_threshold` consecutive calls raise one of `exceptions`.
+        While open, calls raise `CircuitOpenError` without calling the callable. After
+        `recovery_time` seconds the circuit is half open: one trial call is let through, which
+        closes the circuit if it succeeds and opens it again if it fails. Calls interrupted by other
+        exceptions (e.g. cancelled) leave the state unchanged.
+
+        The state ("closed", "open" or "half_open") is accessible as the attribute `state`. Metrics
+        are accessible as attributes: `calls`, `failures`, `rejections` and `trips` (times the
+        circuit opened). The clock (`time.monotonic`) is configurable.
+    """
+    def __init__(self,
+                    callable_,
+                    failure_threshold=5,
+                    recovery_time=30.0,
+                    exceptions=(Exception,),
+                    clock=None):
+        import threading as _threading
+
+        super().__init__(callable_)
+
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.exceptions = exceptions
+        self.clock = _get_clock(clock)
+
+        self.state = "closed"
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+        self.trips = 0
+
+        self._consecutive_failures = 0
+        self._t_open = None
+        self._trial_running = False
+        self._lock = _threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.callable,
+                                self.failure_threshold,
+                                self.recovery_time,
+                                self.exceptions,
+                                self.clock))
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        self._before_call()
+        try:
+            r = super().__call__(*args,**kwargs)
+        except self.exceptions:
+            self._on_failure()
+            raise
+        except BaseException: # Neither a failure nor a success (e.g. cancellation)
+            self._on_abort()
+            raise
+        self._on_success()
+        return r
+
+    async def _async_call(self,*args,**kwargs):
+        self._before_call()
+        try:
+            r = await super().__call__(*args,**kwargs)
+        except self.exceptions:
+            self._on_failure()
+            raise
+        except BaseException: # Neither a failure nor a success (e.g. cancellation)
+            self._on_abort()
+            raise
+        self._on_success()
+        return r
+
+    # State transitions
+    def _before_call(self):
+        with self._lock:
+            self.calls += 1
+
+            if self.state == "open" and self.clock() - self._t_open >= self.recovery_time:
+                self.state = "half_open"
+
+            if (self.state == "open"
+                or (self.state == "half_open" and self._trial_running)):
+                self.rejections += 1
+                raise CircuitOpenError("Circuit open")
+
+            if self.state == "half_open": self._trial_running = True
+
+    def _on_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            if self.state == "half_open":
+                self._trial_running = False
+                self.state = "closed"
+
+    def _on_abort(self):
+        with self._lock:
+            if self.state == "half_open": self._trial_running = False # Let another trial through
+
+    def _on_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self.state == "half_open": self._trial_running = False
+
+            if (self.state == "half_open"
+                or self._consecutive_failures >= self.failure_threshold):
+                if self.state != "open": self.trips += 1
+                self.state = "open"
+                self._t_open = self.clock()
+
+
 class MultiCallableDecorator(DecoratorBase): # Does not inherit off of Decorator cuz it decorates various callables
     def __init__(self, callables, args=tuple(),kwargs=dict()):
         self.callables = callables
+        self.is_async = any(map(_is_async_callable,callables))
         
         super().__init__(args=(callables,*args),kwargs=kwargs)
 
+    def __reduce__(self):
+        return (type(self), (self.callables,))
+
     # Doc generation 
     def _get_doc(self):
         return "" # TODO finish up autodoc
@@ -187,19 +978,405 @@ class MultiCallableDecorator(DecoratorBase): # Does not inherit off of Decorator
 class CompositionDecorator(MultiCallableDecorator): 
     def __init__(self,callables):
         super().__init__(callables)
+
+        self._async_stages = tuple(map(_is_async_callable,callables))
         
     def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
         r = self.callables[0](*args,**kwargs)
         for callable_ in self.callables[1:]:
             r = callable_(r)
 
         return r    
 
+    async def _async_call(self,*args,**kwargs):
+        stages = zip(self.callables,self._async_stages)
+
+        callable_, is_async = next(stages)
+        r = callable_(*args,**kwargs)
+        if is_async: r = await r
+
+        for callable_, is_async in stages:
+            r = callable_(r)
+            if is_async: r = await r
+
+        return r
+
 class CombinationDecorator(MultiCallableDecorator): 
-    def __init__(self,callables):
+    def __init__(self,callables,concurrency_limit=None):
         super().__init__(callables)
 
+        self.concurrency_limit = concurrency_limit
+        self._async_branches = tuple(map(_is_async_callable,callables))
+
+    def __reduce__(self):
+        return (type(self), (self.callables, self.concurrency_limit))
+
     def __call__(self,*args,**kwargs):
         oc = _object_manipulation.ObjectCaller(args=args,kwargs=kwargs)
+        if self.is_async: return self._async_call(oc)
+
         return tuple(map(oc,self.callables))
-        
\ No newline at end of file
+
+    async def _async_call(self,oc):
+        import asyncio as _asyncio
+
+        semaphore = None
+        if self.concurrency_limit is not None:
+            semaphore = _asyncio.Semaphore(self.concurrency_limit)
+
+        branches = map(self._call_branch,
+                        _itertools.repeat(oc),
+                        self.callables,
+                        self._async_branches,
+                        _itertools.repeat(semaphore))
+
+        return tuple(await _asyncio.gather(*branches))
+
+    async def _call_branch(self,oc,callable_,is_async,semaphore):
+        if semaphore is None:
+            r = oc(callable_)
+            return (await r) if is_async else r
+
+        async with semaphore:
+            r = oc(callable_)
+            return (await r) if is_async else r
+        
+## Dispatch
+class DispatchDecorator(MultiCallableDecorator):
+    """
+        Route each call to one of several callables, by a key of its arguments.
+
+        `callables` is a dictionary from keys to callables. `key_extractor` is called with the
+        arguments of each call (e.g. an `AttributeExtractor`, a `KeyExtractor` or `type`), and the
+        call is routed with a single dictionary lookup to the callable of its key. Calls with
+        unknown keys are routed to `fallback`, or raise `KeyError` if there is none.
+
+        With `mro`, keys are types and a call is routed to the callable of the first type in the
+        MRO of its key. MRO resolutions are cached. Routes are added with `register`.
+
+        If any route (or the fallback) is a coroutine callable, the decorator is async: every call
+        returns a coroutine, which awaits the result of the async routes only.
+    """
+    def __init__(self,
+                    callables,
+                    key_extractor,
+                    fallback=None,
+                    mro=False):
+        super().__init__(dict(callables))
+
+        self.key_extractor = key_extractor
+        self.fallback = fallback
+        self.mro = mro
+
+        self._update_routes()
+
+    def __reduce__(self):
+        return (type(self), (self.callables,
+                                self.key_extractor,
+                                self.fallback,
+                                self.mro))
+
+    def __call__(self,*args,**kwargs):
+        if self.is_async: return self._async_call(*args,**kwargs)
+
+        callable_, _ = self._route(args,kwargs)
+        return callable_(*args,**kwargs)
+
+    async def _async_call(self,*args,**kwargs):
+        callable_, is_async = self._route(args,kwargs)
+
+        r = callable_(*args,**kwargs)
+        if is_async: r = await r
+        return r
+
+    def _route(self,args,kwargs):
+        """(callable, is_async) of the route of a call."""
+        key = self.key_extractor(*args,**kwargs)
+        try:
+            return self._routes[key]
+        except KeyError:
+            return self._resolve(key)
+
+    def register(self,key,callable_):
+        """Route the calls with key `key` to `callable_`."""
+        self.callables[key] = callable_
+        self._update_routes()
+
+    def _update_routes(self):
+        # Extended with the MRO resolutions
+        self._routes = {key : (callable_, _is_async_callable(callable_))
+                            for key, callable_ in self.callables.items()}
+        self._fallback_route = (self.fallback, _is_async_callable(self.fallback))
+        self.is_async = any((is_async for _, is_async in (*self._routes.values(),self._fallback_route)))
+
+    def _resolve(self,key):
+        route = self._fallback_route
+        if self.mro:
+            for base in getattr(key,"__mro__",()):
+                if base in self.callables:
+                    route = self._routes[base]
+                    break
+            if route[0] is not None: self._routes[key] = route
+
+        if route[0] is None: raise KeyError(key)
+        return route
+
+## Stack compilation
+class CompiledStack(object):
+    """
+        Single-frame equivalent of a stack of decorators, built by `compile_stack`.
+
+        Calling an instance runs generated code that performs the argument manipulation of every
+        compiled layer inline. The original stack is kept in the attribute `stack`, and its repr
+        and doc are preserved. The generated source is available as `source`.
+    """
+    def __init__(self, stack, source):
+        self.stack = stack
+        self.source = source
+        self.is_async = _is_async_callable(stack)
+
+        self.__doc__ = stack.__doc__
+
+    def __repr__(self):
+        return repr(self.stack)
+
+    def __reduce__(self): # The generated code is rebuilt on unpickling
+        return (compile_stack, (self.stack,))
+
+class _StackCompiler(object):
+    """
+        Emits the source of a function equivalent to a decorator stack.
+
+        Positional arguments are tracked at compile time either as `("star", name)` (a variable
+        holding an iterable) or `("list", names)` (a known number of single variables). Keyword
+        arguments are a variable name or None (no keyword arguments).
+    """
+    _INDENT = "    "
+
+    def __init__(self):
+        self.lines = []
+        self.namespace = {}
+        self._sized = {"args"}
+        self._counter = _itertools.count()
+
+    # Helpers
+    def _new(self, prefix):
+        return "_{}{}".format(prefix, next(self._counter))
+
+    def _const(self, value):
+        name = self._new("c")
+        self.namespace[name] = value
+        return name
+
+    def _emit(self, line, depth=1):
+        self.lines.append(self._INDENT*depth + line)
+
+    def _pos_expr(self, pos):
+        kind, value = pos
+        if kind == "star": return value
+        return "({})".format("".join(map("{},".format,value)))
+
+    def _call_expr(self, func, pos, kw):
+        kind, value = pos
+        parts = ["*" + value] if kind == "star" else list(value)
+        if kw is not None: parts.append("**" + kw)
+        return "{}({})".format(func, ", ".join(parts))
+
+    # Compilation
+    def compile(self, obj, pos, kw):
+        compiler = self._COMPILERS.get(type(obj))
+        if compiler is None or (obj.is_async and type(obj) in self._AWAITING):
+            compiler = _StackCompiler._compile_leaf
+        return compiler(self, obj, pos, kw)
+
+    def _compile_leaf(self, obj, pos, kw):
+        r = self._new("r")
+        self._emit("{} = {}".format(r, self._call_expr(self._const(obj), pos, kw)))
+        return r
+
+    def _compile_decorator(self, obj, pos, kw):
+        return self.compile(obj.callable, pos, kw)
+
+    def _compile_preargument(self, obj, pos, kw):
+        if obj.substitution_policy is not _default_preargs():
+            a, k = self._new("a"), self._new("k")
+            self._emit("{}, {} = {}({}, {}, {}, {})".format(a, k,
+                                                            self._const(obj.substitution_policy),
+                                                            self._const(obj.preargs),
+                                                            self._pos_expr(pos),
+                                                            self._const(obj.prekwargs),
+                                                            kw or "{}"))
+            return self.compile(obj.callable, ("star", a), k)
+
+        if len(obj.preargs) > 0:
+            if pos[0] == "star" and pos[1] not in self._sized:
+                p = self._new("p")
+                self._emit("{} = tuple({})".format(p, pos[1]))
+                pos = ("star", p)
+
+            a = self._new("a")
+            self._sized.add(a)
+            pos_expr = self._pos_expr(pos)
+            self._emit("{} = [*{}, *{}[len({}):]]".format(a, pos_expr, self._const(tuple(obj.preargs)), pos_expr))
+            pos = ("star", a)
+
+        if len(obj.prekwargs) > 0:
+            k = self._new("k")
+            merged = "**" + self._const(obj.prekwargs)
+            if kw is not None: merged += ", **" + kw
+            self._emit("{} = {{{}}}".format(k, merged))
+            kw = k
+
+        return self.compile(obj.callable, pos, kw)
+
+    def _compile_argpack(self, obj, pos, kw):
+        a = self._new("a")
+        self._sized.add(a)
+        k = self._new("k") if obj.args_kw is not None or obj.kwarg_kw is not None else None
+        self._emit("{} = []".format(a))
+        if k is not None: self._emit("{} = {{}}".format(k))
+
+        pos_expr = self._pos_expr(pos) if pos[0] == "list" else "tuple({})".format(pos[1])
+        packed = ((pos, obj.args_kw, pos_expr),
+                    (kw, obj.kwarg_kw, "{{**{}}}".format(kw)))
+        for value, keyword, expr in packed:
+            if value is None:
+                if obj.discard_empty: continue
+                expr = "{}"
+
+            v = self._new("v")
+            self._emit("{} = {}".format(v, expr))
+
+            if keyword is None: store = "{}.append({})".format(a, v)
+            else: store = "{}[{}] = {}".format(k, repr(keyword), v)
+
+            if not obj.discard_empty: condition = None
+            elif value is pos and pos[0] == "list": condition = None if len(pos[1]) > 0 else False
+            else: condition = v
+
+            if condition is None: self._emit(store)
+            elif condition: self._emit("if {}: {}".format(condition, store))
+
+        if obj.invert_positions: self._emit("{}.reverse()".format(a))
+
+        return self.compile(obj.callable, ("star", a), k)
+
+    def _compile_unpack(self, obj, pos, kw, names):
+        # The fast path applies when the arguments are passed positionally; otherwise the
+        # arguments are bound by a helper with the signature of the decorator, so that errors
+        # are raised as the uncompiled decorator would raise them.
+        targets = tuple(map(self._new, names))
+        binder = self._const(_make_binder(names))
+
+        if pos[0] == "star" and pos[1] not in self._sized:
+            p = self._new("p")
+            self._emit("{} = tuple({})".format(p, pos[1]))
+            self._sized.add(p)
+            pos = ("star", p)
+
+        targets_expr = "".join(map("{},".format, targets))
+        pos_expr = self._pos_expr(pos)
+        if kw is None and pos[0] == "list" and len(pos[1]) == len(names):
+            self._emit("{} = {}".format(targets_expr, pos_expr))
+        else:
+            condition = "len({}) == {}".format(pos_expr, len(names))
+            if kw is not None: condition = "not {} and {}".format(kw, condition)
+            self._emit("if {}: {} = {}".format(condition, targets_expr, pos_expr))
+            self._emit("else: {} = {}".format(targets_expr, self._call_expr(binder, pos, kw)))
+
+        return targets
+
+    def _compile_argunpack(self, obj, pos, kw):
+        a, k = self._compile_unpack(obj, pos, kw, ("arg_list", "kwarg_dict"))
+        return self.compile(obj.callable, ("star", a), k)
+
+    def _compile_posargsunpack(self, obj, pos, kw):
+        a, = self._compile_unpack(obj, pos, kw, ("arg_list",))
+        return self.compile(obj.callable, ("star", a), None)
+
+    def _compile_kwargsunpack(self, obj, pos, kw):
+        k, = self._compile_unpack(obj, pos, kw, ("kwarg_dict",))
+        return self.compile(obj.callable, ("list", ()), k)
+
+    def _compile_rvalue_selector(self, obj, pos, kw):
+        r_value = self.compile(obj.callable, pos, kw)
+        vals, key, e, r = self._new("vals"), self._new("key"), self._new("e"), self._new("r")
+
+        self._emit("{} = []".format(vals))
+        self._emit("for {} in {}:".format(key, self._const(obj.rvalue_keys)))
+        self._emit("try: {}.append({}[{}])".format(vals, r_value, key), 2)
+        self._emit("except (KeyError, TypeError) as {}: {} += {}({}, {}, {})".format(
+                        e, vals, self._const(obj.subscription_error_handler), r_value, key, e), 2)
+        self._emit("{} = tuple({}) if len({}) != 1 else {}[0]".format(r, vals, vals, vals))
+        return r
+
+    def _compile_composition(self, obj, pos, kw):
+        if len(obj.callables) == 0: return self._compile_leaf(obj, pos, kw)
+
+        r = self.compile(obj.callables[0], pos, kw)
+        for callable_ in obj.callables[1:]:
+            r = self.compile(callable_, ("list", (r,)), None)
+        return r
+
+    def _compile_combination(self, obj, pos, kw):
+        # Every branch reads the arguments, which may be a single-use iterator
+        if len(obj.callables) > 1 and pos[0] == "star" and pos[1] not in self._sized:
+            p = self._new("p")
+            self._emit("{} = tuple({})".format(p, pos[1]))
+            self._sized.add(p)
+            pos = ("star", p)
+
+        rs = tuple((self.compile(callable_, pos, kw) for callable_ in obj.callables))
+        r = self._new("r")
+        self._emit("{} = ({})".format(r, "".join(map("{},".format, rs))))
+        return r
+
+    _COMPILERS = {
+        Decorator : _compile_decorator,
+        PreargumentDecorator : _compile_preargument,
+        ArgPackDecorator : _compile_argpack,
+        ArgUnpackDecorator : _compile_argunpack,
+        PosargsUnpackDecorator : _compile_posargsunpack,
+        KwargsUnpackDecorator : _compile_kwargsunpack,
+        ReturnValueSelectorDecorator : _compile_rvalue_selector,
+        CompositionDecorator : _compile_composition,
+        CombinationDecorator : _compile_combination,
+    }
+
+    # Decorators that await the result of their callables are not inlined when async
+    _AWAITING = (ReturnValueSelectorDecorator, CompositionDecorator, CombinationDecorator)
+
+def _make_binder(names):
+    namespace = {}
+    exec("def _bind({0}): return {0},".format(", ".join(names)), namespace)
+    return namespace["_bind"]
+
+def compile_stack(decorator):
+    """
+        Compile a stack of decorators into a single generated function.
+
+        The stack is walked through the `callable` and `callables` attributes of the decorators,
+        and the argument manipulation of every known decorator class is emitted inline in the
+        source of a single function, which is then executed with `exec`. Callables that are not
+        instances of the decorator classes of this module (including subclasses, which may
+        override `__call__`) are called as they are.
+
+        The configuration of the decorators is read at compile time: later changes to their
+        attributes are not reflected on the compiled stack.
+
+        Returns a `CompiledStack` instance, with the doc and repr of `decorator`.
+    """
+    compiler = _StackCompiler()
+    r = compiler.compile(decorator, ("star", "args"), "kwargs")
+
+    source = "\n".join(("def __call__(self, *args, **kwargs):",
+                        *compiler.lines,
+                        compiler._INDENT + "return " + r))
+
+    exec(compile(source, "<compiled {}>".format(type(decorator).__name__), "exec"), compiler.namespace)
+
+    cls = type(CompiledStack.__name__, (CompiledStack,), {"__call__" : compiler.namespace["__call__"],
+                                                            "__module__" : __name__})
+    return cls(decorator, source)
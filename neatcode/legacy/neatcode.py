@@ -8,43 +8,61 @@ import itertools
 
     
 ## Higher order functions
+# The wrappers are module level classes instead of closures so that they can be pickled
+class _ArgstarWrapper(object):
+    def __init__(self,f):
+        functools.update_wrapper(self,f)
+        self.f = f
+    def __call__(self,*arg_l):
+        return self.f(*itertools.chain(*arg_l))
+    def __reduce__(self):
+        return (argstar_deco,(self.f,))
+
 def argstar_deco(f):
     """Function decorator that unfolds positional arguments 1 level before passing them to the wrapped function
     as variable length positional arguments."""
-    @functools.wraps(f)
-    def _f(*arg_l):
-        return f(*itertools.chain(*arg_l))
-    
-    return _f
+    return _ArgstarWrapper(f)
 
-def preargs_deco(f, preargs=tuple(),prekwargs=dict()):
-    """Function decorator that applies certain arguments to the parameters of a function as defaults"""
-    @functools.wraps(f)
-    def _f(*postargs,**postkwargs):
-        args = list(postargs) + list(preargs)[len(postargs):]
-        kwargs = dict(prekwargs)
+class _PreargsWrapper(object):
+    def __init__(self,f,preargs,prekwargs):
+        functools.update_wrapper(self,f)
+        self.f = f
+        self.preargs = preargs
+        self.prekwargs = prekwargs
+    def __call__(self,*postargs,**postkwargs):
+        args = list(postargs) + list(self.preargs)[len(postargs):]
+        kwargs = dict(self.prekwargs)
         for k,v in postkwargs.items():
             kwargs[k] = v
             
-        return f(*args,**kwargs)
-            
-    return _f
+        return self.f(*args,**kwargs)
+    def __reduce__(self):
+        return (preargs_deco,(self.f,self.preargs,self.prekwargs))
 
-def function_composition(*funcs):
-    """Compound multiple functions "funcs" by calling them sequentially in order, and feeding the ouput of a function to the input of the next.
-    The functions in "func" must be callable with a single positional argument, except for the first function.
-    Return a function that computes the function composition. The parameters of the returned function are the same as the first function in "funcs"."""
-    def _f(*args,**kwargs):
+def preargs_deco(f, preargs=tuple(),prekwargs=dict()):
+    """Function decorator that applies certain arguments to the parameters of a function as defaults"""
+    return _PreargsWrapper(f,preargs,prekwargs)
+
+class _CompositionWrapper(object):
+    def __init__(self,funcs):
+        self.funcs = funcs
+    def __call__(self,*args,**kwargs):
         partial = None
         
-        if funcs:
-            partial = funcs[0](*args,**kwargs)
-            for f in funcs[1:]:
+        if self.funcs:
+            partial = self.funcs[0](*args,**kwargs)
+            for f in self.funcs[1:]:
                 partial = f(partial)
                 
         return partial
-    
-    return _f
+    def __reduce__(self):
+        return (function_composition,self.funcs)
+
+def function_composition(*funcs):
+    """Compound multiple functions "funcs" by calling them sequentially in order, and feeding the ouput of a function to the input of the next.
+    The functions in "func" must be callable with a single positional argument, except for the first function.
+    Return a function that computes the function composition. The parameters of the returned function are the same as the first function in "funcs"."""
+    return _CompositionWrapper(funcs)
 
 ## Null func
 def null_func(*args,**kwargs):
@@ -57,19 +75,23 @@ class Mapper(object):
         self.f = f
     def __call__(self,it):
         return map(self.f,it)
+    def __reduce__(self):
+        return (type(self),(self.f,))
     
 class StarMapper(Mapper):
     def __init__(self,f):
         super().__init__(argstar_deco(f))
     def __call__(self,*its):
         f_it = its[0] if len(its) == 1 else zip(*its)
-        return super()(f_it)
+        return super().__call__(f_it)
+    def __reduce__(self):
+        return (type(self),(self.f.f,))
     
 class FuncMapper(Mapper):
     def __init__(self,fs):
         super().__init__(fs)
     def __call__(self,*args,**kwargs):
-        return map(lambda x: x(*args,**kwargs),self.fs)
+        return map(lambda x: x(*args,**kwargs),self.f)
         
 ### Direct functions
 def starmap(*its,f=null_func):
@@ -104,3 +126,5 @@ class KeyRemaper:
         
     def __call__(self,l):
         return key_remap(l,self.map_table,self.inplace)
+    def __reduce__(self):
+        return (type(self),(self.map_table,self.inplace))
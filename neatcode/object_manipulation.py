@@ -5,6 +5,9 @@ class AttributeExtractor(object):
     def __call__(self,obj):
         return getattr(obj,self.attr_name)
 
+    def __reduce__(self):
+        return (type(self), (self.attr_name,))
+
 class KeyExtractor(object):
     def __init__(self,key):
         self.key = key
@@ -12,6 +15,9 @@ class KeyExtractor(object):
     def __call__(self,obj):
         return obj[self.key]
 
+    def __reduce__(self):
+        return (type(self), (self.key,))
+
 class ObjectCaller(object):
     def __init__(self,
                     args=tuple(), 
@@ -23,6 +29,9 @@ class ObjectCaller(object):
     def __call__(self,obj):
         return obj(*self.args, **self.kwargs)
 
+    def __reduce__(self):
+        return (type(self), (self.args, self.kwargs))
+
 class MethodCaller(AttributeExtractor,ObjectCaller):
     def __init__(self,method_name, 
                         args=tuple(), 
@@ -36,5 +45,137 @@ class MethodCaller(AttributeExtractor,ObjectCaller):
         method = AttributeExtractor.__call__(self,obj) # call superclass to get the method
         return ObjectCaller.__call__(self,method)
 
+    def __reduce__(self):
+        return (type(self), (self.attr_name, self.args, self.kwargs))
 
-        
+## Shared memory
+class SharedBuffer(object):
+    """
+        Copy of a buffer in a shared memory segment.
+
+        The buffer (`bytes`, `bytearray`, `memoryview` or any other object supporting the buffer
+        protocol, e.g. a NumPy array) is copied once into a new segment. When pickled, only the
+        name of the segment and the layout of the buffer are sent, and unpickling attaches to the
+        segment. `view` returns a `memoryview` of the segment with the format and shape of the
+        original buffer, without copies (read-only if the original was).
+
+        The creating process owns the segment and must `unlink` it when it is no longer needed.
+    """
+    def __init__(self, obj):
+        from multiprocessing import shared_memory as _shared_memory
+
+        buffer = memoryview(obj)
+        self.nbytes = buffer.nbytes
+        self.format = buffer.format
+        self.shape = buffer.shape
+        self.readonly = buffer.readonly
+
+        self._shm = _shared_memory.SharedMemory(create=True, size=max(self.nbytes,1))
+        self._owner = True
+        self._shm.buf[:self.nbytes] = buffer.cast("B") if buffer.c_contiguous else buffer.tobytes()
+
+    @classmethod
+    def _attach(cls, name, nbytes, format, shape, readonly):
+        from multiprocessing import shared_memory as _shared_memory
+
+        self = cls.__new__(cls)
+        self.nbytes = nbytes
+        self.format = format
+        self.shape = shape
+        self.readonly = readonly
+
+        try:
+            self._shm = _shared_memory.SharedMemory(name=name, track=False) # Python >= 3.13
+        except TypeError:
+            self._shm = _shared_memory.SharedMemory(name=name)
+        self._owner = False
+        return self
+
+    def __reduce__(self):
+        return (type(self)._attach, (self.name,
+                                        self.nbytes,
+                                        self.format,
+                                        self.shape,
+                                        self.readonly))
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def view(self):
+        view = self._shm.buf[:self.nbytes]
+        try:
+            view = view.cast(self.format, self.shape)
+        except (TypeError, ValueError): # Formats not supported by memoryview.cast
+            pass
+        return view.toreadonly() if self.readonly else view
+
+    def close(self):
+        """Detach from the segment (fails with BufferError while views of it exist)."""
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the segment (only in the owner process)."""
+        if self._owner: self._shm.unlink()
+
+class SharedMemoryObjectCaller(ObjectCaller):
+    """
+        `ObjectCaller` that places its buffer arguments in shared memory.
+
+        Arguments supporting the buffer protocol with at least `min_nbytes` bytes are copied once
+        into `SharedBuffer`s, so pickling the caller (e.g. to send it to worker processes) does not
+        copy them. Called objects receive zero-copy `memoryview`s of the buffers, which are
+        released after the call.
+
+        The segments must be released with `close` and `unlink` (see `SharedArgumentsCM` in
+        `neatcode.context_management`).
+    """
+    def __init__(self,
+                    args=tuple(),
+                    kwargs=dict(),
+                    min_nbytes=0):
+        self.min_nbytes = min_nbytes
+
+        args = tuple(map(self._share,args))
+        kwargs = dict(zip(kwargs.keys(),map(self._share,kwargs.values())))
+        super().__init__(args=args, kwargs=kwargs)
+
+    def __reduce__(self):
+        return (type(self), (self.args, self.kwargs, self.min_nbytes))
+
+    def __call__(self,obj):
+        views = []
+        def resolve(value):
+            if not isinstance(value,SharedBuffer): return value
+            views.append(value.view())
+            return views[-1]
+
+        args = tuple(map(resolve,self.args))
+        kwargs = dict(zip(self.kwargs.keys(),map(resolve,self.kwargs.values())))
+        try:
+            return obj(*args, **kwargs)
+        finally:
+            for view in views:
+                try:
+                    view.release()
+                except BufferError: # The called object kept an export of the view
+                    pass
+
+    @property
+    def buffers(self):
+        return tuple((v for v in (*self.args, *self.kwargs.values()) if isinstance(v,SharedBuffer)))
+
+    def close(self):
+        for buffer in self.buffers: buffer.close()
+
+    def unlink(self):
+        for buffer in self.buffers: buffer.unlink()
+
+    def _share(self,value):
+        if isinstance(value,SharedBuffer): return value
+        try:
+            buffer = memoryview(value)
+        except TypeError:
+            return value
+        if buffer.nbytes < self.min_nbytes: return value
+        return SharedBuffer(buffer)
@@ -1,3 +1,5 @@
 from neatcode.policy import argument_substitution
+from neatcode.policy import backoff
+from neatcode.policy import rate_limiting
 
-__all__ = ("argument_substitution",)
\ No newline at end of file
+__all__ = ("argument_substitution","backoff","rate_limiting")
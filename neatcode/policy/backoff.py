@@ -0,0 +1,38 @@
+# Backoff policies. A backoff policy is called with the index of a retry (starting at 0) and returns
+# the delay in seconds before it.
+
+class ExponentialBackoff(object):
+    """Delay of `base * factor**retry` seconds, capped at `max_delay`. A `jitter` in [0, 1]
+    randomly shortens each delay by up to that fraction (1 is "full jitter")."""
+    def __init__(self,
+                    base=0.1,
+                    factor=2,
+                    max_delay=None,
+                    jitter=1.0,
+                    random=None): # random.random if None
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.random = random
+
+    def __call__(self, retry):
+        delay = self.base * self.factor**retry
+        if self.max_delay is not None: delay = min(delay, self.max_delay)
+
+        if self.jitter > 0:
+            random = self.random
+            if random is None:
+                import random as _random
+                random = _random.random
+            delay *= 1 - self.jitter*random()
+
+        return delay
+
+class ConstantBackoff(object):
+    """Delay of `delay` seconds before every retry."""
+    def __init__(self, delay=0.1):
+        self.delay = delay
+
+    def __call__(self, retry):
+        return self.delay
@@ -0,0 +1,56 @@
+# Rate limiting algorithms. A bucket is constructed with a `rate` (admissions per second) and a
+# `capacity`, and exposes three methods taking the current time of a monotonic clock:
+#
+#   delay(now)      Time to wait before the next admission (inf if it cannot be admitted)
+#   consume(now)    Admit one call (the caller is responsible for waiting the delay)
+#   idle(now)       True if the bucket is back to its initial state, so it can be discarded
+
+class TokenBucket(object):
+    """Allows bursts of up to `capacity` calls, refilled at `rate` tokens per second."""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+
+        self.tokens = capacity
+        self.t_last = None
+
+    def _refill(self, now):
+        if self.t_last is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.t_last)*self.rate)
+        self.t_last = now
+
+    def delay(self, now):
+        self._refill(now)
+        return max(0.0, (1 - self.tokens)/self.rate)
+
+    def consume(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def idle(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class LeakyBucket(object):
+    """Spaces calls evenly at `rate` calls per second, with up to `capacity` calls waiting (no limit
+    if None)."""
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+
+        self.t_next = None
+
+    def delay(self, now):
+        if self.t_next is None or self.t_next <= now: return 0.0
+
+        delay = self.t_next - now
+        if self.capacity is not None and delay*self.rate >= self.capacity:
+            return float("inf")
+        return delay
+
+    def consume(self, now):
+        t_start = now if self.t_next is None else max(now, self.t_next)
+        self.t_next = t_start + 1/self.rate
+
+    def idle(self, now):
+        return self.t_next is None or self.t_next <= now
@@ -1,9 +1,18 @@
 # TODO document code
 
 import unittest
+import asyncio
+import threading
+import time
+from unittest import mock
 
 from neatcode import context_management as cm
 
+calls = []
+def square(x):
+    calls.append(x)
+    return x*x
+
 class CMTest(unittest.TestCase):
 
     def test_dict_overwrite(self):
@@ -49,7 +58,91 @@ class CMTest(unittest.TestCase):
         
         self.assertEqual(rprod,prod(test_array))
         self.assertEqual(rsum,sum(test_array))
-    
-        
 
+    def test_memo_scope(self):
+        reports = []
+        del calls[:]
+        with cm.MemoScopeCM(("square",),report=reports.append) as memo:
+            self.assertTrue(hasattr(square,"cache_info"))
+            self.assertEqual([square(2),square(2),square(3)],[4,4,9])
+            self.assertEqual(calls,[2,3])
+
+            with cm.MemoScopeCM(("square",)) as inner:
+                square(2)
+                square(2)
+            self.assertEqual(inner.cache_info["square"].hits,1)
+            self.assertEqual(inner.cache_info["square"].misses,1)
+
+        self.assertFalse(hasattr(square,"__wrapped__"))
+        self.assertEqual(memo.cache_info["square"].hits,2)
+        self.assertEqual(memo.cache_info["square"].misses,2)
+        self.assertEqual(memo.hit_rate(),0.5)
+        self.assertEqual(reports,[memo.cache_info])
+
+        square(2)
+        self.assertEqual(calls,[2,3,2])
+
+    def test_memory(self):
+        memory = cm.MemoryCM(top_n=3)
+        kept = []
+        for _ in range(3):
+            with memory:
+                kept.append(bytearray(1000000))
+                temporary = bytearray(2000000)
+                del temporary
+
+        self.assertEqual(memory.n_entries,3)
+        self.assertGreaterEqual(memory.net_bytes,1000000)
+        self.assertLess(memory.net_bytes,1500000)
+        self.assertGreaterEqual(memory.peak_bytes,3000000)
+        self.assertGreaterEqual(memory.total_net_bytes,3000000)
+        self.assertGreaterEqual(memory.mean_net_bytes(),1000000)
+        self.assertLessEqual(len(memory.top_stats),3)
+        self.assertGreaterEqual(memory.top_stats[0].size_diff,1000000)
+
+    def test_memory_without_peak_reset(self):
+        with mock.patch.object(cm.MemoryCM,"_can_reset_peak",return_value=False):
+            memory = cm.MemoryCM()
+            with memory:
+                kept = bytearray(1000000)
+
+        self.assertGreaterEqual(memory.net_bytes,1000000)
+        self.assertIsNone(memory.peak_bytes) # Would include the peak before entry
+        self.assertIsNone(memory.max_peak_bytes)
+
+    def test_concurrency_limit(self):
+        limit = cm.ConcurrencyLimitCM(2)
+
+        def worker():
+            with limit:
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(limit.entries,6)
+        self.assertEqual(limit.max_active,2)
+        self.assertEqual(limit.active,0)
+        self.assertGreater(limit.waits,0)
+
+        non_blocking = cm.ConcurrencyLimitCM(1,blocking=False)
+        with non_blocking:
+            with self.assertRaises(cm.ConcurrencyLimitExceeded):
+                with non_blocking: pass
+        self.assertEqual(non_blocking.rejections,1)
+
+    def test_async_concurrency_limit(self):
+        limit = cm.ConcurrencyLimitCM(2,timeout=1)
+
+        async def task():
+            async with limit:
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(task() for _ in range(6)))
 
+        asyncio.run(run())
+        self.assertEqual(limit.entries,6)
+        self.assertEqual(limit.max_active,2)
+        self.assertEqual(limit.waits,4)
@@ -1,10 +1,17 @@
 # TODO document code    
 
 import unittest
+import asyncio
+import functools
+import inspect
+import random
+import threading
 import time
 
 import neatcode.object_manipulation as object_manipulation
 import neatcode.decoration as decoration
+import neatcode.policy as policy
+import neatcode.context_management as cm
 
 import tests.base as _base
 
@@ -121,5 +128,638 @@ class DocumentationTestDecoration(unittest.TestCase):
 
 
 
+def _echo(*args,**kwargs):
+    return args, kwargs
+
+def _identity(x):
+    return x
+
+class CompileStackTest(_base.TimedUnitTest):
+    LAYERS = (
+        lambda f, rng: decoration.PreargumentDecorator(f,
+                                    preargs=tuple(range(rng.randrange(3))),
+                                    prekwargs={k:k for k in rng.sample("xyz",rng.randrange(3))}),
+        lambda f, rng: decoration.ArgPackDecorator(f,
+                                    args_kw=rng.choice((None,"a")),
+                                    kwarg_kw=rng.choice((None,"k")),
+                                    invert_positions=rng.random() < 0.5,
+                                    discard_empty=rng.random() < 0.5),
+        lambda f, rng: decoration.ArgUnpackDecorator(f),
+        lambda f, rng: decoration.PosargsUnpackDecorator(f),
+        lambda f, rng: decoration.KwargsUnpackDecorator(f),
+        lambda f, rng: decoration.ReturnValueSelectorDecorator(f,rvalue_keys=rng.choice(((0,),(1,0),(0,"x")))),
+        lambda f, rng: decoration.CompositionDecorator((f,_identity)),
+        lambda f, rng: decoration.CombinationDecorator((f,f)),
+    )
+
+    INPUTS = (
+        ((),{}),
+        ((1,),{}),
+        ((1,2),{}),
+        (((1,2),{"x":3}),{}),
+        (((1,),),{}),
+        (({"y":1},),{}),
+        ((),{"arg_list":(1,),"kwarg_dict":{}}),
+        ((1,2,3),{"x":4}),
+    )
+
+    # Called for new single-use iterators on every call
+    ITERATOR_INPUTS = (
+        lambda: ((iter((1,2)),),{}),
+        lambda: ((iter((1,2)),{"x":3}),{}),
+        lambda: ((),{"arg_list":iter((1,)),"kwarg_dict":{}}),
+    )
+
+    def _inputs(self):
+        return (*((lambda i=i: i) for i in self.INPUTS), *self.ITERATOR_INPUTS)
+
+    def _normalize(self, r):
+        """`r` with the iterators it contains replaced by their remaining items."""
+        if isinstance(r,(tuple,list)): return type(r)(map(self._normalize,r))
+        if isinstance(r,dict): return {k:self._normalize(v) for k, v in r.items()}
+        if hasattr(r,"__next__"): return ("iterator",tuple(r))
+        return r
+
+    def _call_outcome(self, f, args, kwargs):
+        try:
+            return self._normalize(f(*args,**kwargs))
+        except Exception as e:
+            return type(e)
+
+    def test_equivalence(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            f = _echo
+            for _ in range(rng.randrange(1,7)):
+                f = rng.choice(self.LAYERS)(f,rng)
+            compiled = decoration.compile_stack(f)
+
+            self.assertEqual(repr(compiled),repr(f))
+            self.assertEqual(compiled.__doc__,f.__doc__)
+            for make_input in self._inputs():
+                self.assertEqual(self._call_outcome(compiled,*make_input()),
+                                    self._call_outcome(f,*make_input()),
+                                    msg=compiled.source)
+
+    def test_benchmark(self):
+        n_calls = 5000
+        for n_layers in (1,4,16,32):
+            f = _echo
+            for i in range(n_layers):
+                f = decoration.ArgUnpackDecorator(f)
+                f = decoration.ArgPackDecorator(f)
+                f = decoration.PreargumentDecorator(f,prekwargs={"k%d"%i:i})
+            compiled = decoration.compile_stack(f)
+
+            t_start = time.perf_counter()
+            for i in range(n_calls): f(i)
+            t_stack = time.perf_counter() - t_start
+
+            t_start = time.perf_counter()
+            for i in range(n_calls): compiled(i)
+            t_compiled = time.perf_counter() - t_start
+
+            print("%d layers: stack %.3fs, compiled %.3fs, speedup x%.1f" % (
+                    3*n_layers, t_stack, t_compiled, t_stack/t_compiled))
+
+            if n_layers >= 16:
+                self.assertLess(t_compiled,t_stack)
+
+
+async def _async_echo(*args,**kwargs):
+    await asyncio.sleep(0)
+    return args, kwargs
+
+async def _async_increment(x):
+    await asyncio.sleep(0)
+    return x + 1
+
+class AsyncDecorationTest(unittest.TestCase):
+
+    def test_passthrough(self):
+        d = decoration.PreargumentDecorator(_async_echo,preargs=(1,2))
+        self.assertTrue(d.is_async)
+        self.assertEqual(asyncio.run(d(0)),((0,2),{}))
+
+    def test_async_detection(self):
+        class PartialLike: # Not a partial, despite the attributes
+            func, args, keywords = _echo, (), {}
+            async def __call__(self,*args,**kwargs):
+                return args, kwargs
+
+        self.assertTrue(decoration.Decorator(PartialLike()).is_async)
+        self.assertTrue(decoration.Decorator(functools.partial(_async_echo,1)).is_async)
+        self.assertFalse(decoration.Decorator(functools.partial(_echo,1)).is_async)
+        self.assertFalse(decoration.Decorator(PartialLike).is_async)
+
+    @unittest.skipUnless(hasattr(inspect,"markcoroutinefunction"),"Python 3.12+")
+    def test_marked_coroutine_function(self):
+        def echo(*args,**kwargs):
+            return _async_echo(*args,**kwargs)
+
+        self.assertTrue(decoration.Decorator(inspect.markcoroutinefunction(echo)).is_async)
+
+    def test_return_value_selector(self):
+        d = decoration.ReturnValueSelectorDecorator(_async_echo,rvalue_keys=(0,))
+        self.assertTrue(d.is_async)
+        self.assertEqual(asyncio.run(d(1,x=2)),(1,))
+
+    def test_composition(self):
+        c = decoration.CompositionDecorator((_async_increment,_identity,_async_increment))
+        self.assertTrue(c.is_async)
+        self.assertEqual(asyncio.run(c(0)),2)
+
+        nested = decoration.CompositionDecorator((c,c))
+        self.assertTrue(nested.is_async)
+        self.assertEqual(asyncio.run(nested(0)),4)
+
+    def test_combination(self):
+        active = []
+        max_active = []
+
+        async def branch(x):
+            active.append(x)
+            max_active.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(x)
+            return x
+
+        c = decoration.CombinationDecorator((branch,)*6 + (_identity,),concurrency_limit=2)
+        self.assertTrue(c.is_async)
+        self.assertEqual(asyncio.run(c(3)),(3,)*7)
+        self.assertEqual(max(max_active),2)
+
+    def test_sync_unchanged(self):
+        c = decoration.CompositionDecorator((_identity,_identity))
+        self.assertFalse(c.is_async)
+        self.assertEqual(c(1),1)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.t = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self,delay):
+        self.sleeps.append(delay)
+        self.t += delay
+
+class RateLimitTest(unittest.TestCase):
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        d = decoration.RateLimitDecorator(_identity,rate=2,capacity=2,clock=clock,sleep=clock.sleep)
+
+        self.assertEqual([d(i) for i in range(4)],[0,1,2,3])
+        self.assertEqual(clock.sleeps,[0.5,0.5]) # burst of 2, then 2 per second
+        self.assertEqual((d.calls,d.waits,d.wait_time,d.rejections),(4,2,1.0,0))
+
+    def test_leaky_bucket(self):
+        clock = FakeClock()
+        d = decoration.RateLimitDecorator(_identity,rate=4,capacity=2,
+                                            bucket=policy.rate_limiting.LeakyBucket,
+                                            clock=clock,blocking=False)
+        d(0)
+        with self.assertRaises(decoration.RateLimitExceeded):
+            d(1)
+        clock.t += 0.25
+        d(2)
+        self.assertEqual(d.rejections,1)
+
+    def test_per_key(self):
+        clock = FakeClock()
+        d = decoration.RateLimitDecorator(_identity,rate=1,clock=clock,blocking=False,
+                                            key_extractor=object_manipulation.KeyExtractor("user"))
+        d(dict(user="a"))
+        d(dict(user="b"))
+        with self.assertRaises(decoration.RateLimitExceeded):
+            d(dict(user="a"))
+
+    def test_idle_buckets_discarded(self):
+        for bucket in (policy.rate_limiting.TokenBucket,policy.rate_limiting.LeakyBucket):
+            clock = FakeClock()
+            d = decoration.RateLimitDecorator(_identity,rate=10,bucket=bucket,clock=clock,
+                                                key_extractor=_identity)
+            for key in range(1000):
+                d(key)
+                clock.t += 0.01
+
+            self.assertLessEqual(len(d._buckets),2*d._MIN_MAX_BUCKETS)
+            self.assertIn(999,d._buckets) # Active buckets are kept
+
+    def test_max_wait(self):
+        clock = FakeClock()
+        d = decoration.RateLimitDecorator(_identity,rate=1,clock=clock,sleep=clock.sleep,max_wait=0.5)
+        d(0)
+        with self.assertRaises(decoration.RateLimitExceeded):
+            d(1)
+        clock.t += 0.6
+        d(2)
+        self.assertEqual(len(clock.sleeps),1)
+        self.assertAlmostEqual(clock.sleeps[0],0.4)
+
+    def test_async(self):
+        clock = FakeClock()
+        d = decoration.RateLimitDecorator(_async_increment,rate=10,clock=clock,sleep=clock.sleep)
+        self.assertTrue(d.is_async)
+
+        async def run():
+            return [await d(i) for i in range(3)]
+
+        self.assertEqual(asyncio.run(run()),[1,2,3])
+        self.assertEqual(len(clock.sleeps),2)
+
+
+class BatchingTest(unittest.TestCase):
+
+    def test_threads(self):
+        batches = []
+        def bulk(items):
+            batches.append(len(items))
+            return [args[0]*2 for args, kwargs in items]
+
+        d = decoration.BatchingDecorator(bulk,max_batch_size=4,max_wait=0.2)
+        results = [None]*6
+        def worker(i):
+            results[i] = d(i)
+
+        threads = [threading.Thread(target=worker,args=(i,)) for i in range(6)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(results,[0,2,4,6,8,10])
+        self.assertEqual(batches,[4,2])
+        self.assertEqual((d.calls,d.batches),(6,2))
+
+    def test_errors(self):
+        d = decoration.BatchingDecorator(lambda items: [],max_batch_size=1)
+        with self.assertRaises(ValueError):
+            d(0)
+
+        def bulk(items):
+            raise KeyError(items)
+        d = decoration.BatchingDecorator(bulk,max_batch_size=1)
+        with self.assertRaises(KeyError):
+            d(0)
+
+    def test_flush_on_exit(self):
+        d = decoration.BatchingDecorator(lambda items: items,max_batch_size=10,max_wait=None,
+                                            packer=_identity)
+        results = []
+        t = threading.Thread(target=lambda: results.append(d("a")))
+        with cm.CombinedCM((d,)):
+            t.start()
+            while d.calls == 0: time.sleep(0.001)
+        t.join()
+        self.assertEqual(results,["a"])
+
+    def test_async(self):
+        batches = []
+        async def bulk(items):
+            batches.append(len(items))
+            await asyncio.sleep(0)
+            return [kwargs["x"] for args, kwargs in items]
+
+        d = decoration.BatchingDecorator(bulk,max_batch_size=2,max_wait=0.01)
+        self.assertTrue(d.is_async)
+
+        async def run():
+            return await asyncio.gather(*(d(x=i) for i in range(5)))
+
+        self.assertEqual(asyncio.run(run()),[0,1,2,3,4])
+        self.assertEqual(batches,[2,2,1])
+
+    def test_async_cancelled_caller(self):
+        async def bulk(items):
+            await asyncio.sleep(0.01)
+            return items
+
+        d = decoration.BatchingDecorator(bulk,max_batch_size=2,max_wait=None,packer=_identity)
+
+        async def run():
+            first = asyncio.ensure_future(d(1))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(d(2))
+            await asyncio.sleep(0)
+            second.cancel()
+            return await asyncio.wait_for(first,1)
+
+        self.assertEqual(asyncio.run(run()),1)
+
+
+class Flaky(object):
+    def __init__(self,n_failures,error=ConnectionError):
+        self.n_failures = n_failures
+        self.error = error
+        self.n_calls = 0
+
+    def __call__(self,x):
+        self.n_calls += 1
+        if self.n_calls <= self.n_failures: raise self.error(x)
+        return x
+
+class ResilienceTest(unittest.TestCase):
+
+    def test_backoff(self):
+        backoff = policy.backoff.ExponentialBackoff(base=1,factor=2,max_delay=5,jitter=0.5,random=lambda: 1.0)
+        self.assertEqual(list(map(backoff,range(5))),[0.5,1,2,2.5,2.5])
+
+    def test_retry(self):
+        clock = FakeClock()
+        backoff = policy.backoff.ExponentialBackoff(base=1,jitter=0)
+        d = decoration.RetryDecorator(Flaky(2),max_retries=3,backoff=backoff,clock=clock,sleep=clock.sleep)
+
+        self.assertEqual(d(1),1)
+        self.assertEqual(clock.sleeps,[1,2])
+        self.assertEqual((d.calls,d.attempts,d.retries,d.failures),(1,3,2,0))
+
+        d = decoration.RetryDecorator(Flaky(5),max_retries=3,backoff=backoff,clock=clock,sleep=clock.sleep)
+        with self.assertRaises(ConnectionError):
+            d(1)
+        self.assertEqual((d.attempts,d.failures),(4,1))
+
+        d = decoration.RetryDecorator(Flaky(1,KeyError),exceptions=(ConnectionError,))
+        with self.assertRaises(KeyError):
+            d(1)
+        self.assertEqual(d.attempts,1)
+
+    def test_retry_budget(self):
+        clock = FakeClock()
+        backoff = policy.backoff.ExponentialBackoff(base=1,jitter=0)
+        d = decoration.RetryDecorator(Flaky(5),max_retries=10,backoff=backoff,budget=4,
+                                        clock=clock,sleep=clock.sleep)
+        with self.assertRaises(ConnectionError):
+            d(1)
+        self.assertEqual(clock.sleeps,[1,2]) # Waiting 4 more seconds would exceed the budget
+
+    def test_retry_async(self):
+        clock = FakeClock()
+        flaky = Flaky(2)
+        async def call(x):
+            return flaky(x)
+
+        d = decoration.RetryDecorator(call,clock=clock,sleep=clock.sleep)
+        self.assertEqual(asyncio.run(d(1)),1)
+        self.assertEqual(d.retries,2)
+
+    def test_timeout(self):
+        d = decoration.TimeoutDecorator(time.sleep,timeout=0.05)
+        d(0)
+        with self.assertRaises(TimeoutError):
+            d(1)
+        self.assertEqual((d.calls,d.timeouts),(2,1))
+
+        d = decoration.TimeoutDecorator(asyncio.sleep,timeout=0.05)
+        self.assertTrue(d.is_async)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(d(1))
+
+    def test_timeout_own_error(self):
+        def fail():
+            raise TimeoutError("socket")
+        async def async_fail():
+            raise TimeoutError("socket")
+
+        for d, call in ((decoration.TimeoutDecorator(fail,timeout=5),lambda d: d()),
+                        (decoration.TimeoutDecorator(async_fail,timeout=5),lambda d: asyncio.run(d()))):
+            with self.assertRaisesRegex(TimeoutError,"socket"):
+                call(d)
+            self.assertEqual(d.timeouts,0)
+
+    def test_hedging(self):
+        delays = iter([0.01]*5 + [1,0.01])
+        d = decoration.HedgingDecorator(lambda: time.sleep(next(delays)) or "done",
+                                        percentile=50,min_samples=5)
+        for _ in range(5): d()
+        self.assertIsNotNone(d.hedge_delay())
+
+        t_start = time.monotonic()
+        self.assertEqual(d(),"done")
+        self.assertLess(time.monotonic() - t_start,0.5)
+        self.assertEqual((d.calls,d.hedges,d.hedge_wins),(6,1,1))
+
+    def test_hedging_async(self):
+        delays = iter([0.01]*5 + [1,0.01])
+        async def call():
+            await asyncio.sleep(next(delays))
+            return "done"
+
+        d = decoration.HedgingDecorator(call,percentile=50,min_samples=5)
+
+        async def run():
+            for _ in range(6): r = await d()
+            return r
+
+        t_start = time.monotonic()
+        self.assertEqual(asyncio.run(run()),"done")
+        self.assertLess(time.monotonic() - t_start,0.5)
+        self.assertEqual((d.hedges,d.hedge_wins),(1,1))
+
+    def test_hedging_ignores_failures(self):
+        outage = [True]
+        def call():
+            if outage[0]: raise ConnectionError() # Fast failure
+            time.sleep(0.02)
+            return "done"
+
+        d = decoration.HedgingDecorator(call,percentile=50,min_samples=5)
+        for _ in range(10):
+            with self.assertRaises(ConnectionError): d()
+        self.assertIsNone(d.hedge_delay()) # Failures are not recorded
+        self.assertEqual(d.hedges,0)
+
+        outage[0] = False
+        for _ in range(5): d()
+        self.assertGreaterEqual(d.hedge_delay(),0.02)
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        flaky = Flaky(3)
+        d = decoration.CircuitBreakerDecorator(flaky,failure_threshold=2,recovery_time=10,clock=clock)
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError): d(1)
+        self.assertEqual(d.state,"open")
+        with self.assertRaises(decoration.CircuitOpenError): d(1)
+
+        clock.t += 10
+        with self.assertRaises(ConnectionError): d(1) # Failed trial
+        self.assertEqual(d.state,"open")
+
+        clock.t += 10
+        self.assertEqual(d(1),1)
+        self.assertEqual(d.state,"closed")
+        self.assertEqual((d.calls,d.failures,d.rejections,d.trips,flaky.n_calls),(5,3,1,2,4))
+
+    def test_circuit_breaker_cancelled_trial(self):
+        clock = FakeClock()
+        async def call(x):
+            if x is None: raise ConnectionError()
+            await asyncio.sleep(x)
+
+        d = decoration.CircuitBreakerDecorator(call,failure_threshold=1,recovery_time=10,clock=clock)
+
+        async def run():
+            with self.assertRaises(ConnectionError): await d(None)
+            clock.t += 10
+            trial = asyncio.ensure_future(d(10))
+            await asyncio.sleep(0)
+            trial.cancel()
+            with self.assertRaises(asyncio.CancelledError): await trial
+
+        asyncio.run(run())
+        self.assertEqual(d.state,"half_open") # Not closed by the cancellation
+        self.assertIsNone(asyncio.run(d(0))) # Another trial is let through
+        self.assertEqual(d.state,"closed")
+
+
+class ReprCacheTest(unittest.TestCase):
+
+    def test_deep_stack(self):
+        f = _echo
+        for _ in range(500):
+            f = decoration.PosargsUnpackDecorator(f)
+
+        r = repr(f)
+        self.assertEqual(r.count("PosargsUnpackDecorator("),500)
+        self.assertIs(repr(f),r) # Cached
+
+    def test_invalidation(self):
+        inner = decoration.Decorator(_echo)
+        outer = decoration.CompositionDecorator((inner,_identity))
+        r = repr(outer)
+
+        inner._repr_kwargs = dict(x=1)
+        self.assertNotEqual(repr(outer),r)
+        self.assertIn("x=1",repr(outer))
+
+    def test_nested_composition(self):
+        f = _echo
+        for _ in range(2000): # Deeper than the recursion limit
+            f = decoration.CompositionDecorator((f,_identity))
+
+        r = repr(f)
+        self.assertEqual(r.count("CompositionDecorator(("),2000)
+        self.assertIs(repr(f),r) # Cached
+
+        # The reprs of the children in the tuple argument are reused, not recomputed
+        inner = f.callables[0]
+        version = inner._repr_version
+        self.assertIs(repr(f),r)
+        self.assertEqual(inner._repr_version,version)
+        self.assertTrue(r.startswith("CompositionDecorator((" + repr(inner) + ", "))
+
+    def test_mutable_arguments(self):
+        callables = [_echo]
+        f = decoration.CompositionDecorator(callables)
+        repr(f)
+
+        callables.append(_identity)
+        self.assertIn("_identity",repr(f))
+
+    def test_independent_caches(self):
+        inner = decoration.Decorator(_echo)
+        outer = decoration.Decorator(inner)
+        d = decoration.DispatchDecorator(dict(a=_echo),type)
+        r = repr(outer)
+        version = outer._repr_version
+
+        d.register("b",_identity)
+        self.assertIn("_identity",repr(d))
+        self.assertIs(repr(outer),r)
+        self.assertEqual(outer._repr_version,version)
+
+    def test_abbreviation(self):
+        f = decoration.CompositionDecorator((_echo,)*10)
+        full = repr(f)
+
+        f._REPR_MAX_LENGTH = 40
+        r = repr(f)
+        self.assertEqual(len(r),40)
+        self.assertTrue(r.startswith("CompositionDecorator(("))
+        self.assertTrue(r.endswith("...)"))
+
+        f._REPR_MAX_LENGTH = len(full)
+        self.assertEqual(repr(f),full)
+
+
+class DispatchTest(_base.TimedUnitTest):
+
+    def test_key_dispatch(self):
+        d = decoration.DispatchDecorator(dict(a=_identity,b=len),
+                                            object_manipulation.KeyExtractor("route"))
+        self.assertEqual(d(dict(route="a")),dict(route="a"))
+        self.assertEqual(d(dict(route="b")),1)
+        with self.assertRaises(KeyError):
+            d(dict(route="c"))
+
+        d.register("c",_identity)
+        self.assertIn("'c'",repr(d))
+        self.assertEqual(d(dict(route="c")),dict(route="c"))
+
+    def test_type_dispatch(self):
+        d = decoration.DispatchDecorator({int:abs,object:repr,str:len},type,mro=True)
+        self.assertEqual(d(-1),1)
+        self.assertEqual(d(True),1) # bool -> int
+        self.assertEqual(d("ab"),2)
+        self.assertEqual(d(None),"None")
+        self.assertIs(d._routes[bool][0],abs)
+
+        d = decoration.DispatchDecorator({int:abs},type,fallback=_identity,mro=True)
+        self.assertEqual(d(1.5),1.5)
+
+    def test_mixed_routes(self):
+        async def negate(x):
+            return -x
+
+        d = decoration.DispatchDecorator({int:negate,str:len},type)
+        self.assertTrue(d.is_async)
+        self.assertEqual(asyncio.run(d(1)),-1)
+        self.assertEqual(asyncio.run(d("ab")),2) # Sync routes return coroutines too
+
+        retry = decoration.RetryDecorator(d)
+        self.assertEqual(asyncio.run(retry("ab")),2)
+
+    def test_benchmark(self):
+        n_calls = 20000
+        rng = random.Random(0)
+        for n_routes in (10,100,1000):
+            routes = tuple(range(n_routes))
+            calls = [dict(route=rng.choice(routes)) for _ in range(n_calls)]
+
+            predicates = [(KeyEquals("route",k),_identity) for k in routes]
+            def scan(x):
+                for predicate, callable_ in predicates:
+                    if predicate(x): return callable_(x)
+
+            d = decoration.DispatchDecorator(dict.fromkeys(routes,_identity),
+                                                object_manipulation.KeyExtractor("route"))
+
+            t_start = time.perf_counter()
+            for x in calls: scan(x)
+            t_scan = time.perf_counter() - t_start
+
+            t_start = time.perf_counter()
+            for x in calls: d(x)
+            t_dispatch = time.perf_counter() - t_start
+
+            print("%d routes: linear scan %.3fs, dispatch %.3fs, speedup x%.1f" % (
+                    n_routes, t_scan, t_dispatch, t_scan/t_dispatch))
+
+            if n_routes >= 100:
+                self.assertLess(t_dispatch,t_scan)
+
+class KeyEquals(object):
+    def __init__(self,key,value):
+        self.key = key
+        self.value = value
+
+    def __call__(self,obj):
+        return obj[self.key] == self.value
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
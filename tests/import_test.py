@@ -0,0 +1,55 @@
+import unittest
+import os
+import subprocess
+import sys
+
+import neatcode
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importtime(statement):
+    """Modules imported by `statement` and the cumulative import time (us) of each of them, as
+    reported by `python -X importtime`."""
+    p = subprocess.run((sys.executable, "-X", "importtime", "-c", statement),
+                        cwd=_ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit(): continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+class ImportTest(unittest.TestCase):
+
+    def test_lazy_package(self):
+        baseline = _importtime("pass")
+        package = _importtime("import neatcode")
+
+        self.assertEqual(set(package) - set(baseline),{"neatcode"})
+        print("import neatcode: %dus" % package["neatcode"])
+
+    def test_deferred_imports(self):
+        baseline = set(_importtime("pass"))
+        for module in ("neatcode.decoration","neatcode.context_management"):
+            times = _importtime("import " + module)
+            imported = set(times) - baseline
+
+            self.assertFalse(imported & {"re","inspect","asyncio","tracemalloc","neatcode.policy"},
+                                msg=module)
+            print("import %s: %dus" % (module, times[module]))
+
+    def test_lazy_names(self):
+        import neatcode.decoration as decoration
+
+        self.assertIs(neatcode.PreargumentDecorator,decoration.PreargumentDecorator)
+        self.assertIs(neatcode.decoration,decoration)
+        for name in neatcode.__all__:
+            self.assertTrue(hasattr(neatcode,name),msg=name)
+        with self.assertRaises(AttributeError):
+            neatcode.NotAName
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+import operator
+import pickle
+import concurrent.futures
+import array
+from multiprocessing import shared_memory
+
+import neatcode.object_manipulation as object_manipulation
+import neatcode.decoration as decoration
+import neatcode.legacy.neatcode as legacy
+import neatcode.context_management as cm
+
+
+async def _async_neg(x):
+    return -x
+
+class _Scaled(decoration.Decorator): # User subclass with its own constructor
+    def __init__(self,callable_,factor):
+        super().__init__(callable_,args=(factor,))
+        self.factor = factor
+
+    def __call__(self,*args,**kwargs):
+        return self.factor*super().__call__(*args,**kwargs)
+
+class _CountedRetry(decoration.RetryDecorator):
+    def __init__(self,callable_):
+        super().__init__(callable_,max_retries=1)
+
+def _run(f,args,kwargs):
+    r = f(*args,**kwargs)
+    if asyncio.iscoroutine(r): r = asyncio.run(r)
+    if isinstance(r,map): r = list(r)
+    return r
+
+def _cases():
+    """(callable, args, kwargs) for every picklable class"""
+    return (
+        (object_manipulation.AttributeExtractor("real"), (3,), {}),
+        (object_manipulation.KeyExtractor("a"), (dict(a=1),), {}),
+        (object_manipulation.ObjectCaller(args=(1,2)), (operator.add,), {}),
+        (object_manipulation.MethodCaller("__getitem__",args=("a",)), (dict(a=1),), {}),
+        (decoration.Decorator(abs), (-1,), {}),
+        (decoration.PreargumentDecorator(divmod,preargs=(7,2)), (9,), {}),
+        (decoration.ArgPackDecorator(len), (1,2,3), {}),
+        (decoration.ArgUnpackDecorator(max), ((1,5),{}), {}),
+        (decoration.PosargsUnpackDecorator(max), ((1,5),), {}),
+        (decoration.KwargsUnpackDecorator(dict), (dict(a=1),), {}),
+        (decoration.ReturnValueSelectorDecorator(divmod,(1,)), (7,2), {}),
+        (decoration.ReturnValueSelectorDecorator(abs,(0,)), (-2,), {}),
+        (decoration.ReturnValueSelectorDecorator(_async_neg,(0,)), (2,), {}),
+        (decoration.RateLimitDecorator(abs,rate=1000,capacity=100), (-1,), {}),
+        (decoration.BatchingDecorator(tuple,max_batch_size=1), (-1,), {}),
+        (decoration.RetryDecorator(abs), (-1,), {}),
+        (decoration.TimeoutDecorator(abs,timeout=10), (-1,), {}),
+        (decoration.HedgingDecorator(abs), (-1,), {}),
+        (decoration.CircuitBreakerDecorator(abs), (-1,), {}),
+        (decoration.CompositionDecorator((divmod,sum,abs)), (-7,2), {}),
+        (decoration.CombinationDecorator((abs,operator.neg)), (-1,), {}),
+        (decoration.CombinationDecorator((_async_neg,abs),concurrency_limit=1), (-1,), {}),
+        (decoration.DispatchDecorator({int:abs,str:len},type), (-1,), {}),
+        (_Scaled(abs,3), (-1,), {}),
+        (_CountedRetry(abs), (-1,), {}),
+        (decoration.compile_stack(decoration.PreargumentDecorator(divmod,preargs=(7,2))), (9,), {}),
+        (legacy.argstar_deco(max), ((1,2),(3,)), {}),
+        (legacy.preargs_deco(divmod,preargs=(7,2)), (9,), {}),
+        (legacy.function_composition(divmod,sum), (7,2), {}),
+        (legacy.Mapper(abs), ((-1,-2),), {}),
+        (legacy.StarMapper(operator.add), ((1,2),(3,4)), {}),
+        (legacy.FuncMapper((abs,operator.neg)), (-1,), {}),
+        (legacy.KeyRemaper(dict(a="b")), (dict(a=1),), {}),
+    )
+
+class PickleTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for f, args, kwargs in _cases():
+            g = pickle.loads(pickle.dumps(f))
+            self.assertEqual(type(g).__qualname__,type(f).__qualname__)
+            if isinstance(f,(decoration.DecoratorBase,decoration.CompiledStack)):
+                self.assertEqual(repr(g),repr(f))
+                self.assertEqual(g.__doc__,f.__doc__)
+            self.assertEqual(_run(g,args,kwargs),_run(f,args,kwargs))
+
+    def test_process_pool(self):
+        cases = _cases()
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            futures = [executor.submit(_run,f,args,kwargs) for f, args, kwargs in cases]
+            for future, (f, args, kwargs) in zip(futures,cases):
+                self.assertEqual(future.result(),_run(f,args,kwargs))
+
+
+class SharedMemoryTest(unittest.TestCase):
+
+    def test_shared_arguments(self):
+        data = bytes(range(256))*40000
+        numbers = array.array("d",range(1000))
+        with cm.SharedArgumentsCM(args=(data,5),kwargs=dict(numbers=numbers),min_nbytes=16) as caller:
+            self.assertEqual(len(caller.buffers),2)
+            self.assertLess(len(pickle.dumps(caller)),1000)
+            names = [b.name for b in caller.buffers]
+
+            with concurrent.futures.ProcessPoolExecutor(2) as executor:
+                r = executor.submit(caller,_read).result()
+            self.assertEqual(r,(5,len(data),"d",(1000,),999.0))
+
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_zero_copy(self):
+        with cm.SharedArgumentsCM(args=(bytearray(10),)) as caller:
+            with concurrent.futures.ProcessPoolExecutor(1) as executor:
+                executor.submit(caller,_write).result()
+            view = caller.buffers[0].view()
+            self.assertEqual(view[0],42)
+            view.release()
+
+def _read(data,i,numbers):
+    return data[i], data.nbytes, numbers.format, numbers.shape, numbers[-1]
+
+def _write(data):
+    data[0] = 42
+
+
+if __name__ == "__main__":
+    unittest.main()